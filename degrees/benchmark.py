@@ -0,0 +1,294 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+import degrees
+import ingest
+from graph import CompactGraph
+from landmarks import LandmarkOracle, landmark_candidates
+from util import Node, QueueFrontier, StackFrontier, \
+    DequeQueueFrontier, DequeStackFrontier
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark degrees search strategies."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--synthetic", type=int, metavar="EDGES",
+                        help="use a random graph with this many star "
+                             "entries instead of a data directory")
+    parser.add_argument("--pairs", type=int, default=20,
+                        help="number of random source/target pairs")
+    parser.add_argument("--frontier-ops", type=int, default=5000,
+                        help="nodes pushed through each frontier")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare-models", action="store_true",
+                        help="compare memory and query latency of the "
+                             "dict model and the compact graph")
+    parser.add_argument("--landmarks", type=int, metavar="K",
+                        help="compare landmark-guided search and distance "
+                             "bounds from K landmarks against BFS")
+    parser.add_argument("--ingest", type=int, metavar="WORKERS",
+                        help="compare serial CSV parsing with chunked "
+                             "parsing across WORKERS processes")
+    parser.add_argument("--all-paths", type=int, metavar="LIMIT",
+                        help="time enumerating up to LIMIT shortest paths "
+                             "between highly connected people")
+    args = parser.parse_args()
+
+    if args.all_paths:
+        compare_all_paths(args.directory, args.all_paths, args.pairs)
+        return
+    if args.ingest:
+        compare_ingest(args.directory, args.ingest)
+        return
+    if args.compare_models:
+        compare_models(args.directory, args.pairs, args.seed)
+        return
+    if args.landmarks:
+        compare_landmarks(args.directory, args.landmarks,
+                          args.pairs, args.seed)
+        return
+
+    print("Loading data...")
+    if args.synthetic:
+        synthetic_data(args.synthetic, args.seed)
+    else:
+        degrees.load_data(args.directory)
+    print(f"Data loaded: {len(degrees.people)} people, "
+          f"{len(degrees.movies)} movies.")
+
+    compare_frontiers(args.frontier_ops)
+    pairs = random_pairs(args.pairs, args.seed)
+    compare_search(pairs)
+
+
+def synthetic_data(edges, seed, cast_size=10):
+    """
+    Fills the degrees data model with a random graph of `edges`
+    star entries, with movies of `cast_size` people drawn from a
+    pool of one person per five entries.
+    """
+    rng = random.Random(seed)
+    person_count = max(edges // 5, cast_size)
+    for i in range(person_count):
+        person_id = str(i)
+        name = f"person {i}"
+        degrees.people[person_id] = {
+            "name": name, "birth": "", "movies": set()
+        }
+        degrees.names[name] = {person_id}
+
+    for i in range(max(edges // cast_size, 1)):
+        movie_id = str(i)
+        stars = {str(rng.randrange(person_count)) for _ in range(cast_size)}
+        degrees.movies[movie_id] = {
+            "title": f"movie {i}", "year": "", "stars": stars
+        }
+        degrees.movie_years[movie_id] = 0
+        for person_id in stars:
+            degrees.people[person_id]["movies"].add(movie_id)
+
+
+def random_pairs(count, seed):
+    """
+    Returns `count` random (source, target) pairs of person ids.
+    """
+    rng = random.Random(seed)
+    people = sorted(degrees.people)
+    return [(rng.choice(people), rng.choice(people)) for _ in range(count)]
+
+
+def random_pairs_from_graph(count, seed):
+    """
+    Returns `count` random (source, target) pairs of person ids
+    from the compact graph.
+    """
+    rng = random.Random(seed)
+    people = degrees.graph.person_ids
+    return [
+        (people[rng.randrange(len(people))],
+         people[rng.randrange(len(people))])
+        for _ in range(count)
+    ]
+
+
+def time_frontier(frontier_class, count):
+    """
+    Pushes `count` nodes through a frontier, checking membership
+    before each add as the search does, and returns the wall time.
+    """
+    frontier = frontier_class()
+    start = time.perf_counter()
+    for i in range(count):
+        if not frontier.contains_state(i):
+            frontier.add(Node(i, None, None))
+    while not frontier.empty():
+        frontier.remove()
+    return time.perf_counter() - start
+
+
+def compare_frontiers(count):
+    """
+    Prints the time taken by the list-backed and deque-backed
+    frontiers for the same workload.
+    """
+    for frontier_class in (StackFrontier, DequeStackFrontier,
+                           QueueFrontier, DequeQueueFrontier):
+        elapsed = time_frontier(frontier_class, count)
+        print(f"{frontier_class.__name__:>19}: {elapsed:.4f}s "
+              f"for {count} nodes")
+
+
+def time_search(pairs, **options):
+    """
+    Runs `shortest_path` over every pair and returns the total number
+    of people expanded, the total wall time and the path lengths found.
+    """
+    expanded = 0
+    lengths = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        stats = {}
+        path = degrees.shortest_path(source, target, stats=stats, **options)
+        expanded += stats["expanded"]
+        lengths.append(None if path is None else len(path))
+    return expanded, time.perf_counter() - start, lengths
+
+
+def compare_search(pairs):
+    """
+    Prints nodes expanded and wall time for single-ended and
+    bidirectional BFS over the same pairs.
+    """
+    results = {
+        "bfs": time_search(pairs),
+        "bidirectional": time_search(pairs, bidirectional=True),
+        "lazy": time_search(pairs, lazy=True),
+    }
+    if results["bfs"][2] != results["bidirectional"][2]:
+        print("Warning: strategies disagree on path lengths")
+    for name, (expanded, elapsed, _) in results.items():
+        print(f"{name:>19}: {expanded} expanded, {elapsed:.4f}s "
+              f"over {len(pairs)} pairs")
+    print(f"{'neighbor cache':>19}: {degrees.neighbor_cache.stats()}")
+
+
+def compare_models(directory, count, seed):
+    """
+    Prints the memory held by the dict model and the compact graph
+    after loading `directory`, and their query latency on the same
+    random pairs.
+    """
+    # Make sure a current snapshot exists before timing it
+    degrees.load_data(directory, compact=True)
+    pairs = random_pairs_from_graph(count, seed)
+
+    models = {
+        "dict": dict(compact=False, snapshot=False),
+        "compact": dict(compact=True, snapshot=False),
+        "snapshot": dict(compact=True, snapshot=True),
+    }
+    for name, options in models.items():
+        degrees.clear_data()
+        tracemalloc.start()
+        start = time.perf_counter()
+        degrees.load_data(directory, **options)
+        elapsed = time.perf_counter() - start
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        expanded, search_time, _ = time_search(pairs, bidirectional=True)
+        print(f"{name:>19}: {size / 2 ** 20:.1f} MiB, loaded in "
+              f"{elapsed:.2f}s (traced), {search_time / count * 1000:.2f}ms "
+              f"per query")
+
+
+def compare_landmarks(directory, k, count, seed):
+    """
+    Prints preprocessing time for `k` landmarks, how tight their
+    distance bounds are, and nodes expanded by landmark-guided search
+    against plain and bidirectional BFS.
+    """
+    degrees.load_data(directory, compact=True)
+    pairs = random_pairs_from_graph(count, seed)
+
+    start = time.perf_counter()
+    oracle = LandmarkOracle(degrees.graph, k)
+    print(f"{'preprocessing':>19}: {time.perf_counter() - start:.2f}s "
+          f"for {len(oracle.landmarks)} landmarks")
+
+    results = {
+        "bfs": time_search(pairs),
+        "bidirectional": time_search(pairs, bidirectional=True),
+        "landmarks": time_search(pairs, oracle=oracle),
+    }
+    if len({tuple(lengths) for _, _, lengths in results.values()}) > 1:
+        print("Warning: strategies disagree on path lengths")
+    for name, (expanded, elapsed, _) in results.items():
+        print(f"{name:>19}: {expanded} expanded, {elapsed:.4f}s "
+              f"over {len(pairs)} pairs")
+
+    exact, slack = 0, 0
+    start = time.perf_counter()
+    bounds = [oracle.bounds(source, target) for source, target in pairs]
+    elapsed = time.perf_counter() - start
+    for (lower, upper), length in zip(bounds, results["bfs"][2]):
+        if length is None or upper is None:
+            continue
+        exact += lower == upper == length
+        slack += upper - lower
+    print(f"{'bounds':>19}: {elapsed / len(pairs) * 1e6:.1f}us per query, "
+          f"{exact} exact, {slack} total slack")
+
+
+def compare_ingest(directory, workers):
+    """
+    Prints the time taken to parse the CSV files of `directory` into
+    a CompactGraph serially and with the chunked process pool, and
+    rows/s per file and peak RSS for the latter.
+    """
+    start = time.perf_counter()
+    CompactGraph.from_csv(directory)
+    print(f"{'serial':>11}: {time.perf_counter() - start:.2f}s")
+
+    stats = {}
+    ingest.read_graph(directory, workers, stats=stats)
+    for line in ingest.report(stats):
+        print(line)
+
+
+def compare_all_paths(directory, limit, count):
+    """
+    Prints, for pairs drawn from the most connected people, how many
+    shortest paths they have, the time to the first path and to
+    `limit` paths, and the peak memory traced while enumerating.
+    """
+    degrees.load_data(directory, compact=True)
+    hubs = landmark_candidates(degrees.graph)[:2 * count]
+    person_ids = degrees.graph.person_ids
+    pairs = [
+        (person_ids[hubs[i]], person_ids[hubs[-1 - i]])
+        for i in range(min(count, len(hubs) // 2))
+    ]
+
+    for source, target in pairs:
+        total = degrees.count_shortest_paths(source, target)
+        tracemalloc.start()
+        start = time.perf_counter()
+        paths = degrees.all_shortest_paths(source, target, limit=limit)
+        first = next(paths, None)
+        first_time = time.perf_counter() - start
+        enumerated = 0 if first is None else 1 + sum(1 for _ in paths)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{source:>10} -> {target:<10}: {total} paths, "
+              f"first in {first_time * 1000:.1f}ms, {enumerated} in "
+              f"{elapsed * 1000:.1f}ms, peak {peak / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import math
+
+
+class PathConstraints():
+    """
+    Restrictions on the movies and people a path may go through:
+    movies released between `min_year` and `max_year` (inclusive,
+    either may be None), and none of the `exclude_people` or
+    `exclude_movies` ids. Movies without a known year are left out
+    whenever a year range is given.
+
+    The constraints are compiled once per query into masks indexed
+    like the compact graph, so that checking a movie or a person
+    while expanding neighbors is a single array lookup.
+    """
+
+    def __init__(self, min_year=None, max_year=None,
+                 exclude_people=(), exclude_movies=()):
+        self.min_year = min_year
+        self.max_year = max_year
+        self.exclude_people = set(exclude_people)
+        self.exclude_movies = set(exclude_movies)
+
+    def year_bounds(self):
+        """
+        Returns the (low, high) inclusive bounds on years (0 if unknown)
+        of the movies that may be used. Unknown years fall outside
+        them whenever a year range is given.
+        """
+        if self.min_year is None and self.max_year is None:
+            return 0, math.inf
+        low = 1 if self.min_year is None else max(self.min_year, 1)
+        high = math.inf if self.max_year is None else self.max_year
+        return low, high
+
+    def allows_year(self, year):
+        """
+        Returns True if a movie released in `year` (0 if unknown)
+        may be used.
+        """
+        low, high = self.year_bounds()
+        return low <= year <= high
+
+    def movie_mask(self, graph):
+        """
+        Returns a bytearray with a 1 for every movie index of `graph`
+        that a path may go through.
+        """
+        mask = graph.year_mask(*self.year_bounds())
+        for movie_id in self.exclude_movies:
+            movie = graph.movie_index.get(movie_id)
+            if movie is not None:
+                mask[movie] = 0
+        return mask
+
+    def person_mask(self, graph):
+        """
+        Returns a bytearray with a 1 for every person index of `graph`
+        that a path may go through.
+        """
+        mask = bytearray(b"\x01") * len(graph.person_ids)
+        for person_id in self.exclude_people:
+            person = graph.person_index.get(person_id)
+            if person is not None:
+                mask[person] = 0
+        return mask
+
+
+def parse_year(year):
+    """
+    Returns `year` as an int, or 0 if it is not a number.
+    """
+    return int(year) if year.isdigit() else 0
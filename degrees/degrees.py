@@ -1,7 +1,13 @@
+import argparse
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from constraints import PathConstraints, parse_year
+from graph import CompactGraph
+from landmarks import alt_path
+from nameindex import NameIndex
+from snapshot import load_snapshot, source_stats, write_snapshot
+from util import Node, DequeQueueFrontier, LRUCache
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,10 +18,76 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Maps movie_ids to their year as an int, 0 where unknown, so that
+# constrained searches need not parse the year strings in `movies`
+movie_years = {}
 
-def load_data(directory):
+# CompactGraph holding people and movies instead of the dicts above,
+# when data is loaded with compact=True
+graph = None
+
+# Recent neighbors_for_person results, bounded by the total number of
+# (movie_id, person_id) pairs held
+neighbor_cache = LRUCache(max_size=2_000_000)
+
+# NameIndex over `names` for prefix and fuzzy lookups
+name_index = None
+
+
+def load_data(directory, compact=False, snapshot=True, workers=None):
     """
     Load data from CSV files into memory.
+
+    With `compact` set, people and movies are kept in an
+    integer-indexed CompactGraph and only `names` is filled in.
+
+    With `snapshot` set, a binary snapshot of the data is written
+    next to the CSV files after they are parsed, and read instead of
+    them on later runs for as long as the CSV files are unchanged.
+    In compact mode the snapshot is mapped into memory and titles are
+    only decoded when they are needed.
+
+    With `workers` set, the CSV files are parsed concurrently in
+    chunks by that many processes (see ingest.read_graph).
+    """
+    global graph, name_index
+    neighbor_cache.invalidate()
+
+    # Stats are taken before parsing, so that CSV files changed while
+    # they are parsed leave the new snapshot stale
+    sources = source_stats(directory) if snapshot else None
+    cached = load_snapshot(directory) if snapshot else None
+
+    if cached is None and workers:
+        # Only needed for --workers, and it pulls in multiprocessing
+        from ingest import read_graph
+        cached = read_graph(directory, workers)
+        if snapshot:
+            save_snapshot(cached, directory, sources)
+
+    if compact:
+        if cached is not None:
+            graph = cached
+        else:
+            graph = CompactGraph.from_csv(directory)
+            if snapshot:
+                save_snapshot(graph, directory, sources)
+        for person_id, name in zip(graph.person_ids, graph.person_names):
+            names.setdefault(name.lower(), set()).add(person_id)
+    elif cached is not None:
+        fill_data(cached)
+    else:
+        load_csv(directory)
+        if snapshot:
+            save_snapshot(CompactGraph.from_data(people, movies), directory,
+                          sources)
+
+    name_index = NameIndex(names)
+
+
+def load_csv(directory):
+    """
+    Fill `names`, `people`, `movies` and `movie_years` from the CSV files.
     """
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
@@ -40,6 +112,7 @@ def load_data(directory):
                 "year": row["year"],
                 "stars": set()
             }
+            movie_years[row["id"]] = parse_year(row["year"])
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
@@ -52,14 +125,82 @@ def load_data(directory):
                 pass
 
 
+def fill_data(source):
+    """
+    Fill `names`, `people`, `movies` and `movie_years` from a CompactGraph.
+    """
+    movie_ids = list(source.movie_ids)
+    person_ids = list(source.person_ids)
+    for i, (movie_id, title, year) in enumerate(
+            zip(movie_ids, source.movie_titles, source.movie_years)):
+        movies[movie_id] = {
+            "title": title,
+            "year": year,
+            "stars": {person_ids[p] for p in source.stars_for(i)}
+        }
+    movie_years.update(zip(movie_ids, source.year_index))
+    for i, (person_id, name, birth) in enumerate(
+            zip(person_ids, source.person_names, source.person_births)):
+        people[person_id] = {
+            "name": name,
+            "birth": birth,
+            "movies": {movie_ids[m] for m in source.movies_for(i)}
+        }
+        names.setdefault(name.lower(), set()).add(person_id)
+
+
+def save_snapshot(source, directory, sources=None):
+    """
+    Write a snapshot of `source` for `directory`, with the source_stats
+    `sources`, carrying on without one if the directory cannot be
+    written to.
+    """
+    try:
+        write_snapshot(source, directory, sources)
+    except OSError:
+        pass
+
+
+def clear_data():
+    """
+    Drop all loaded data, so that load_data can be called again.
+    """
+    global graph, name_index
+    neighbor_cache.invalidate()
+    names.clear()
+    people.clear()
+    movies.clear()
+    movie_years.clear()
+    graph = None
+    name_index = None
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        usage="python degrees.py [--compact] [--bidirectional] "
+              "[--no-snapshot] [--workers N] [--min-year YEAR] "
+              "[--max-year YEAR] [directory]"
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep the graph in compact integer arrays")
+    parser.add_argument("--bidirectional", action="store_true",
+                        help="search from both people at once")
+    parser.add_argument("--no-snapshot", dest="snapshot",
+                        action="store_false",
+                        help="always parse the CSV files")
+    parser.add_argument("--workers", type=int,
+                        help="parse the CSV files with this many processes")
+    parser.add_argument("--min-year", type=int,
+                        help="only connect through movies from this year on")
+    parser.add_argument("--max-year", type=int,
+                        help="only connect through movies up to this year")
+    args = parser.parse_args()
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(args.directory, compact=args.compact, snapshot=args.snapshot,
+              workers=args.workers)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +210,11 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    constraints = None
+    if args.min_year is not None or args.max_year is not None:
+        constraints = PathConstraints(args.min_year, args.max_year)
+    path = shortest_path(source, target, bidirectional=args.bidirectional,
+                         constraints=constraints)
 
     if path is None:
         print("Not connected.")
@@ -78,9 +223,9 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_name(path[i][1])
+            person2 = person_name(path[i + 1][1])
+            movie = movie_title(path[i + 1][0])
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
@@ -96,43 +241,475 @@ def build_path(target):
     return path
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False, stats=None,
+                  lazy=False, oracle=None, constraints=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    With `bidirectional` set, the search grows from both ends at once
+    and meets in the middle. With `lazy` set, neighbors are generated
+    one movie at a time, so the search can stop as soon as the target
+    appears instead of building each person's full neighbor set. If
+    `stats` is a dict, the number of people expanded is stored under
+    "expanded".
+
+    Given a LandmarkOracle as `oracle`, the search is an A* search
+    guided by landmark distance bounds instead. This needs data
+    loaded with compact=True.
+
+    Given PathConstraints as `constraints`, only movies and people
+    they allow are expanded, in any of the search modes.
     """
+    if stats is not None:
+        stats["expanded"] = 0
+    if oracle is not None and graph is None:
+        raise ValueError("landmark search needs data loaded with compact=True")
+    if constraints is not None and (
+            source in constraints.exclude_people
+            or target in constraints.exclude_people):
+        return None
 
-    # BFS
+    neighbors = search_neighbors(lazy, constraints)
+    if graph is not None:
+        source = graph.person_index[source]
+        target = graph.person_index[target]
+
+    if oracle is not None:
+        path = alt_path(source, target, neighbors, oracle, stats)
+    elif bidirectional:
+        path = bidirectional_path(source, target, stats, neighbors)
+    else:
+        path = breadth_first_path(source, target, neighbors, stats)
+
+    if path is not None and graph is not None:
+        path = graph.external_path(path)
+    return path
+
+
+def search_neighbors(lazy=False, constraints=None):
+    """
+    Returns the function searches use to expand a person in the
+    loaded model: over person indices for the compact graph, or
+    person_ids for the dicts.
+    """
+    if graph is not None:
+        if constraints is not None:
+            return graph.filtered_neighbors(
+                constraints.movie_mask(graph),
+                constraints.person_mask(graph),
+                lazy
+            )
+        return graph.iter_neighbors if lazy else graph.neighbors
+
+    if constraints is None:
+        return iter_neighbors if lazy else neighbors_for_person
+
+    low, high = constraints.year_bounds()
+    excluded_movies = constraints.exclude_movies
+    excluded = constraints.exclude_people
+
+    def constrained_neighbors(person_id):
+        for movie_id in people[person_id]["movies"]:
+            if (low <= movie_years[movie_id] <= high
+                    and movie_id not in excluded_movies):
+                for star_id in movies[movie_id]["stars"]:
+                    if star_id not in excluded:
+                        yield movie_id, star_id
+
+    if lazy:
+        return constrained_neighbors
+    return lambda person_id: set(constrained_neighbors(person_id))
+
+
+def breadth_first_path(source, target, neighbors, stats=None):
+    """
+    Returns the shortest path from the source to the target as a list
+    of (movie, person) pairs, using `neighbors` to expand each person.
+
+    If no possible path, returns None.
+    """
 
-    frontier = QueueFrontier()
-    
+    # BFS
 
-    frontier.add(Node(source,None,None))
+    frontier = DequeQueueFrontier()
+    frontier.add(Node(source, None, None))
 
-    while frontier.empty() == False:
+    while not frontier.empty():
         active = frontier.remove()
         if active.state == target:
             return build_path(active)
-          
+        frontier.mark_explored(active.state)
 
-        for (movie,person) in neighbors_for_person(active.state):
+        if stats is not None:
+            stats["expanded"] += 1
+
+        for (movie, person) in neighbors(active.state):
+            if frontier.seen(person):
+                continue
             if person == target:
-                return build_path(Node(person,active,movie))
-            else:
-                frontier.add(Node(person,active,movie))
+                return build_path(Node(person, active, movie))
+            frontier.add(Node(person, active, movie))
 
     return None
 
 
+def bidirectional_path(source, target, stats=None, neighbors=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both
+    ends and expanding whichever frontier is smaller, one whole
+    layer at a time.
 
-        
+    If no possible path, returns None.
+    """
+    if neighbors is None:
+        neighbors = neighbors_for_person
+    if source == target:
+        return []
+
+    # Each side maps a person to the (movie_id, person_id) step
+    # leading back towards the end it was reached from
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = expand_layer(
+                forward_layer, forward, backward, neighbors, stats
+            )
+        else:
+            backward_layer, meeting = expand_layer(
+                backward_layer, backward, forward, neighbors, stats
+            )
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
 
 
+def expand_layer(layer, parents, other, neighbors, stats=None):
+    """
+    Expands every person in `layer`, recording newly reached people
+    in `parents`. Returns the next layer and a person already reached
+    by the `other` side, or None if the two searches have not met.
 
+    The whole layer is expanded before returning, so the meeting
+    person chosen is the one with the shortest joined path.
+    """
+    next_layer = []
+    meeting = None
+    best = None
+    for person in layer:
+        if stats is not None:
+            stats["expanded"] += 1
+        for movie, neighbor in neighbors(person):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (movie, person)
+            next_layer.append(neighbor)
+            if neighbor in other:
+                length = path_length(other, neighbor)
+                if best is None or length < best:
+                    best = length
+                    meeting = neighbor
+    return next_layer, meeting
+
+
+def path_length(parents, person):
+    """
+    Returns the number of steps from `person` back to the root
+    of the search described by `parents`.
+    """
+    length = 0
+    while parents[person] is not None:
+        person = parents[person][1]
+        length += 1
+    return length
 
 
+def join_paths(meeting, forward, backward):
+    """
+    Builds the (movie_id, person_id) path from the source to the
+    target through the person where both searches met.
+    """
+    path = []
+    person = meeting
+    while forward[person] is not None:
+        movie, parent = forward[person]
+        path.insert(0, (movie, person))
+        person = parent
+
+    person = meeting
+    while backward[person] is not None:
+        movie, child = backward[person]
+        path.append((movie, child))
+        person = child
+    return path
+
+
+def distances_from(source, constraints=None):
+    """
+    Runs a single BFS from the source and returns two dicts covering
+    every person reachable from it: `distances` maps each person_id
+    to its degrees of separation from the source, and `predecessors`
+    maps each person_id to the (movie_id, person_id) step it was
+    reached through (None for the source itself).
+
+    Paths to any of those people can then be rebuilt with
+    path_from_predecessors without searching again. Given
+    PathConstraints as `constraints`, only paths they allow count.
+    """
+    if constraints is not None and source in constraints.exclude_people:
+        return {}, {}
+    neighbors = search_neighbors(constraints=constraints)
+    start = graph.person_index[source] if graph is not None else source
+
+    distances = {start: 0}
+    predecessors = {start: None}
+    layer = [start]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for person in layer:
+            for movie, neighbor in neighbors(person):
+                if neighbor in distances:
+                    continue
+                distances[neighbor] = depth
+                predecessors[neighbor] = (movie, person)
+                next_layer.append(neighbor)
+        layer = next_layer
+
+    if graph is not None:
+        person_ids, movie_ids = graph.person_ids, graph.movie_ids
+        distances = {
+            person_ids[person]: depth
+            for person, depth in distances.items()
+        }
+        predecessors = {
+            person_ids[person]: None if step is None
+            else (movie_ids[step[0]], person_ids[step[1]])
+            for person, step in predecessors.items()
+        }
+    return distances, predecessors
+
+
+def path_from_predecessors(predecessors, target):
+    """
+    Returns the list of (movie_id, person_id) pairs from the source
+    of a distances_from search to the target.
+
+    If the target was not reached, returns None.
+    """
+    if target not in predecessors:
+        return None
+    path = []
+    while predecessors[target] is not None:
+        movie, parent = predecessors[target]
+        path.append((movie, target))
+        target = parent
+    path.reverse()
+    return path
+
+
+def degrees_histogram(distances):
+    """
+    Returns a dict mapping each degree of separation 1, 2, 3, ...
+    to the number of people at that distance from the source.
+    """
+    histogram = {}
+    for depth in distances.values():
+        if depth > 0:
+            histogram[depth] = histogram.get(depth, 0) + 1
+    return dict(sorted(histogram.items()))
+
+
+def shortest_path_dag(source, target, constraints=None):
+    """
+    Returns the DAG of every shortest path from the source to the
+    target, as a dict mapping each person on one of those paths to the
+    list of (movie, person) steps leading to it from the previous
+    layer. People and movies are indices on the compact graph and
+    ids otherwise. The target comes first and the source last.
+
+    Distances are labelled by a bidirectional BFS that stops at the
+    first layer where both sides meet. Every shortest path crosses
+    one of the people where they met at the least total distance, so
+    the DAG is traced from those people back to each end, and only
+    people on some shortest path get predecessor lists.
+
+    If the target cannot be reached, returns None.
+    """
+    neighbors = search_neighbors(constraints=constraints)
+    if graph is not None:
+        source = graph.person_index[source]
+        target = graph.person_index[target]
+    if source == target:
+        return {source: []}
+
+    forward = {source: 0}
+    backward = {target: 0}
+    forward_layer = [source]
+    backward_layer = [target]
+    meeting = []
+    while forward_layer and backward_layer and not meeting:
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = label_layer(
+                forward_layer, forward, backward, neighbors
+            )
+        else:
+            backward_layer, meeting = label_layer(
+                backward_layer, backward, forward, neighbors
+            )
+    if not meeting:
+        return None
+
+    length = min(forward[person] + backward[person] for person in meeting)
+    middle = [
+        person for person in meeting
+        if forward[person] + backward[person] == length
+    ]
+
+    # From the middle back to the source, any neighbor one step
+    # closer to the source is on a shortest path
+    predecessors = {}
+    layer = middle
+    while layer:
+        next_layer = {}
+        for person in layer:
+            depth = forward[person] - 1
+            predecessors[person] = [
+                (movie, neighbor) for movie, neighbor in neighbors(person)
+                if forward.get(neighbor) == depth
+            ]
+            for _, neighbor in predecessors[person]:
+                if neighbor not in predecessors:
+                    next_layer[neighbor] = None
+        layer = list(next_layer)
+
+    # From the middle on to the target, each person is a predecessor
+    # of its neighbors one step closer to the target
+    layer = middle
+    while layer:
+        next_layer = {}
+        for person in layer:
+            depth = backward[person] - 1
+            for movie, neighbor in neighbors(person):
+                if backward.get(neighbor) == depth:
+                    predecessors.setdefault(neighbor, []).append(
+                        (movie, person)
+                    )
+                    next_layer[neighbor] = None
+        layer = list(next_layer)
+
+    def distance(person):
+        if person in backward:
+            return length - backward[person]
+        return forward[person]
+
+    return dict(sorted(
+        predecessors.items(), key=lambda item: distance(item[0]),
+        reverse=True
+    ))
+
+
+def label_layer(layer, labels, other, neighbors):
+    """
+    Labels everyone first reached from `layer` with their distance in
+    `labels`. Returns the next layer and the people in it that the
+    `other` side has already labelled.
+    """
+    depth = labels[layer[0]] + 1
+    next_layer = []
+    meeting = []
+    for person in layer:
+        for movie, neighbor in neighbors(person):
+            if neighbor in labels:
+                continue
+            labels[neighbor] = depth
+            next_layer.append(neighbor)
+            if neighbor in other:
+                meeting.append(neighbor)
+    return next_layer, meeting
+
+
+def all_shortest_paths(source, target, limit=None, constraints=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connects the source to the target, up to `limit` paths. Paths
+    through different movies count as different paths.
+
+    Paths are generated one at a time by walking the shortest-path
+    DAG back from the target, so they are never all held in memory.
+    """
+    if constraints is not None and (
+            source in constraints.exclude_people
+            or target in constraints.exclude_people):
+        return
+    predecessors = shortest_path_dag(source, target, constraints)
+    if predecessors is None or limit == 0:
+        return
+    goal = graph.person_index[target] if graph is not None else target
+
+    count = 0
+    steps = []
+    stack = [(goal, iter(predecessors[goal]))]
+    while stack:
+        person, options = stack[-1]
+        if not predecessors[person]:
+            # Reached the source: the steps so far form a whole path
+            path = steps[::-1]
+            if graph is not None:
+                path = graph.external_path(path)
+            yield path
+            count += 1
+            if limit is not None and count >= limit:
+                return
+            stack.pop()
+            if steps:
+                steps.pop()
+            continue
+        step = next(options, None)
+        if step is None:
+            stack.pop()
+            if steps:
+                steps.pop()
+            continue
+        movie, parent = step
+        steps.append((movie, person))
+        stack.append((parent, iter(predecessors[parent])))
+
+
+def count_shortest_paths(source, target, constraints=None):
+    """
+    Returns the number of distinct shortest paths between the source
+    and the target without enumerating them, or 0 if not connected.
+    """
+    if constraints is not None and (
+            source in constraints.exclude_people
+            or target in constraints.exclude_people):
+        return 0
+    predecessors = shortest_path_dag(source, target, constraints)
+    if predecessors is None:
+        return 0
+    goal = graph.person_index[target] if graph is not None else target
+
+    # predecessors runs from the target back to the source one layer
+    # at a time, so its reverse is a topological order of the DAG
+    counts = {}
+    for person in reversed(predecessors):
+        steps = predecessors[person]
+        if not steps:
+            counts[person] = 1
+        else:
+            counts[person] = sum(counts[parent] for _, parent in steps)
+    return counts[goal]
+
 
 def person_id_for_name(name):
     """
@@ -141,13 +718,25 @@ def person_id_for_name(name):
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
+        suggestions = candidates_for_name(name, limit=5)
+        if not suggestions:
+            return None
+        print(f"No exact match for '{name}'. Did you mean:")
+        for candidate in suggestions:
+            print(f"ID: {candidate['id']}, Name: {candidate['name']}, "
+                  f"Birth: {candidate['birth']}")
+        try:
+            person_id = input("Intended Person ID: ")
+            if person_id in {c["id"] for c in suggestions}:
+                return person_id
+        except ValueError:
+            pass
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            name = person_name(person_id)
+            birth = person_birth(person_id)
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -160,17 +749,123 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def candidates_for_name(name, limit=10):
+    """
+    Returns up to `limit` people whose names match `name` exactly, by
+    prefix or approximately, best first. Each candidate is a dict of
+    id, name, birth and a match score between 0 and 1.
+    """
+    candidates = []
+    for match, score in name_index.search(name, limit):
+        for person_id in sorted(names[match]):
+            candidates.append({
+                "id": person_id,
+                "name": person_name(person_id),
+                "birth": person_birth(person_id),
+                "score": round(score, 3),
+            })
+    return candidates[:limit]
+
+
+def resolve_person(name, birth=None):
+    """
+    Returns the person_id meant by `name` without prompting, or None.
+
+    `name` resolves if exactly one person has that name, or exactly
+    one of them was born in `birth` when it is given. A person_id is
+    also accepted in place of a name. Use candidates_for_name to list
+    the options when this returns None.
+    """
+    person_ids = names.get(name.lower(), set())
+    if birth is not None:
+        person_ids = {
+            person_id for person_id in person_ids
+            if person_birth(person_id) == str(birth)
+        }
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    if not person_ids and person_exists(name):
+        return name
+    return None
+
+
+def person_exists(person_id):
+    """
+    Returns True if `person_id` is a person in the loaded data.
+    """
+    if graph is not None:
+        return person_id in graph.person_index
+    return person_id in people
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
+
+    Results are kept in `neighbor_cache`, so they are returned
+    as frozensets to keep callers from changing them.
     """
+    return neighbor_cache.get(person_id, compute_neighbors)
+
+
+def compute_neighbors(person_id):
+    """
+    Builds the neighbor set of a person from the loaded data.
+    """
+    if graph is not None:
+        return frozenset(graph.external_path(
+            graph.neighbors(graph.person_index[person_id])
+        ))
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
         for person_id in movies[movie_id]["stars"]:
             neighbors.add((movie_id, person_id))
-    return neighbors
+    return frozenset(neighbors)
+
+
+def iter_neighbors(person_id):
+    """
+    Yields (movie_id, person_id) pairs for people who starred
+    with a given person, one movie at a time and without caching.
+    A co-star of several movies is yielded once for each.
+    """
+    if graph is not None:
+        for movie, person in graph.iter_neighbors(
+                graph.person_index[person_id]):
+            yield graph.movie_ids[movie], graph.person_ids[person]
+        return
+    for movie_id in people[person_id]["movies"]:
+        for star_id in movies[movie_id]["stars"]:
+            yield movie_id, star_id
+
+
+def person_name(person_id):
+    """
+    Returns the name of a person, from whichever model is loaded.
+    """
+    if graph is not None:
+        return graph.person_names[graph.person_index[person_id]]
+    return people[person_id]["name"]
+
+
+def person_birth(person_id):
+    """
+    Returns the birth year of a person, from whichever model is loaded.
+    """
+    if graph is not None:
+        return graph.person_births[graph.person_index[person_id]]
+    return people[person_id]["birth"]
+
+
+def movie_title(movie_id):
+    """
+    Returns the title of a movie, from whichever model is loaded.
+    """
+    if graph is not None:
+        return graph.movie_titles[graph.movie_index[movie_id]]
+    return movies[movie_id]["title"]
 
 
 if __name__ == "__main__":
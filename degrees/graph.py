@@ -0,0 +1,250 @@
+import csv
+from array import array
+from functools import cached_property
+
+
+class CompactGraph():
+    """
+    Actor/movie graph with ids interned to dense integers.
+
+    People and movies are numbered in the order they appear in their
+    CSV files. The person -> movie and movie -> person adjacency is
+    stored in CSR form: the movies of person `i` are
+    `person_movies[person_offsets[i]:person_offsets[i + 1]]`, and
+    likewise for the stars of a movie.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies,
+                 movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+
+    @cached_property
+    def movie_index(self):
+        """
+        Maps movie ids to movie indices, built on first use.
+        """
+        return {movie_id: i for i, movie_id in enumerate(self.movie_ids)}
+
+    @cached_property
+    def year_index(self):
+        """
+        Array of release years by movie index, 0 where unknown,
+        built on first use.
+        """
+        return array("h", (
+            int(year) if year.isdigit() else 0 for year in self.movie_years
+        ))
+
+    @cached_property
+    def year_masks(self):
+        """
+        Movie masks built by year_mask, keyed by year range.
+        """
+        return {}
+
+    def year_mask(self, low, high):
+        """
+        Returns a new bytearray with a 1 for every movie index whose
+        year is between `low` and `high` inclusive. The mask for each
+        range is built once and copied on later calls.
+        """
+        mask = self.year_masks.get((low, high))
+        if mask is None:
+            mask = bytearray(low <= year <= high for year in self.year_index)
+            self.year_masks[(low, high)] = mask
+        return bytearray(mask)
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Build a graph straight from the CSV files in `directory`,
+        without going through the dict-of-sets model.
+        """
+        person_ids, person_names, person_births = [], [], []
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                person_births.append(row["birth"])
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                movie_ids.append(row["id"])
+                movie_titles.append(row["title"])
+                movie_years.append(row["year"])
+
+        person_index = {pid: i for i, pid in enumerate(person_ids)}
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        star_people, star_movies = array("i"), array("i")
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person = person_index.get(row["person_id"])
+                movie = movie_index.get(row["movie_id"])
+                if person is None or movie is None:
+                    continue
+                star_people.append(person)
+                star_movies.append(movie)
+
+        return cls.from_edges(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            star_people, star_movies
+        )
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Build a graph from the dict-of-sets `people` and `movies`
+        model used by degrees.load_data.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        person_index = {pid: i for i, pid in enumerate(person_ids)}
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        star_people, star_movies = array("i"), array("i")
+        for person_id in person_ids:
+            for movie_id in people[person_id]["movies"]:
+                star_people.append(person_index[person_id])
+                star_movies.append(movie_index[movie_id])
+
+        return cls.from_edges(
+            person_ids,
+            [people[pid]["name"] for pid in person_ids],
+            [people[pid]["birth"] for pid in person_ids],
+            movie_ids,
+            [movies[mid]["title"] for mid in movie_ids],
+            [movies[mid]["year"] for mid in movie_ids],
+            star_people, star_movies
+        )
+
+    @classmethod
+    def from_edges(cls, person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   star_people, star_movies):
+        """
+        Build a graph from parallel arrays of (person, movie) index
+        pairs. Duplicate pairs are dropped.
+        """
+        person_offsets, person_movies = build_csr(
+            len(person_ids), star_people, star_movies
+        )
+        movie_offsets, movie_people = build_csr(
+            len(movie_ids), star_movies, star_people
+        )
+        return cls(
+            person_ids, person_names, person_births,
+            movie_ids, movie_titles, movie_years,
+            person_offsets, person_movies,
+            movie_offsets, movie_people
+        )
+
+    def movies_for(self, person):
+        """
+        Returns the movie indices of person index `person`.
+        """
+        offsets = self.person_offsets
+        return self.person_movies[offsets[person]:offsets[person + 1]]
+
+    def stars_for(self, movie):
+        """
+        Returns the person indices of movie index `movie`.
+        """
+        offsets = self.movie_offsets
+        return self.movie_people[offsets[movie]:offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Returns (movie, person) index pairs for people who
+        starred with person index `person`.
+        """
+        return [
+            (movie, star)
+            for movie in self.movies_for(person)
+            for star in self.stars_for(movie)
+        ]
+
+    def iter_neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with person index `person`, one movie at a time.
+        """
+        for movie in self.movies_for(person):
+            for star in self.stars_for(movie):
+                yield movie, star
+
+    def filtered_neighbors(self, movie_mask, person_mask, lazy=False):
+        """
+        Returns a function like `neighbors` (or `iter_neighbors` if
+        `lazy` is set) that skips movies and people whose entry in
+        `movie_mask` or `person_mask` is 0, before scanning their cast.
+        """
+        def neighbors(person):
+            return [
+                (movie, star)
+                for movie in self.movies_for(person) if movie_mask[movie]
+                for star in self.stars_for(movie) if person_mask[star]
+            ]
+
+        def iter_neighbors(person):
+            for movie in self.movies_for(person):
+                if movie_mask[movie]:
+                    for star in self.stars_for(movie):
+                        if person_mask[star]:
+                            yield movie, star
+
+        return iter_neighbors if lazy else neighbors
+
+    def external_path(self, path):
+        """
+        Translates a path of (movie, person) index pairs back
+        into (movie_id, person_id) pairs.
+        """
+        return [
+            (self.movie_ids[movie], self.person_ids[person])
+            for movie, person in path
+        ]
+
+
+def build_csr(size, sources, targets):
+    """
+    Returns (offsets, indices) arrays grouping `targets` by `sources`,
+    for sources numbered 0 to `size` - 1. Each group is sorted and
+    has its duplicates removed.
+    """
+    counts = array("i", [0]) * (size + 1)
+    for source in sources:
+        counts[source + 1] += 1
+    for i in range(size):
+        counts[i + 1] += counts[i]
+
+    indices = array("i", [0]) * len(targets)
+    cursor = counts[:-1]
+    for source, target in zip(sources, targets):
+        indices[cursor[source]] = target
+        cursor[source] += 1
+
+    # Sort each group and drop repeated entries in place
+    offsets = array("i", [0]) * (size + 1)
+    length = 0
+    for i in range(size):
+        group = sorted(set(indices[counts[i]:counts[i + 1]]))
+        indices[length:length + len(group)] = array("i", group)
+        length += len(group)
+        offsets[i + 1] = length
+    del indices[length:]
+    return offsets, indices
@@ -0,0 +1,200 @@
+import csv
+import io
+import os
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from graph import CompactGraph
+
+# Columns read from each CSV file, in the order they are returned
+COLUMNS = {
+    "people.csv": ["id", "name", "birth"],
+    "movies.csv": ["id", "title", "year"],
+    "stars.csv": ["person_id", "movie_id"],
+}
+
+CHUNK_SIZE = 4 * 2 ** 20
+
+
+def read_graph(directory, workers=None, chunk_size=CHUNK_SIZE, stats=None):
+    """
+    Parse the CSV files of `directory` into a CompactGraph, splitting
+    each file into chunks of about `chunk_size` bytes that are parsed
+    by a pool of `workers` processes.
+
+    All three files are parsed at once, with at most two chunks per
+    worker in flight, so memory stays bounded by the finished graph
+    plus a few chunks. Chunks are split on line boundaries, so fields
+    must not contain line breaks (true of the IMDb exports).
+
+    If `stats` is a dict, it is filled with rows, bytes and seconds
+    per file, and the peak resident set size in bytes.
+    """
+    workers = workers or os.cpu_count()
+    if stats is None:
+        stats = {}
+    paths = {name: os.path.join(directory, name) for name in COLUMNS}
+    columns = {
+        name: header_positions(paths[name], COLUMNS[name])
+        for name in COLUMNS
+    }
+    for name in COLUMNS:
+        stats[name] = {"rows": 0, "bytes": 0, "seconds": 0.0}
+
+    # People and movies go first, since stars are looked up in them
+    tasks = [
+        (name, start, end)
+        for name in COLUMNS
+        for start, end in chunk_ranges(paths[name], chunk_size)
+    ]
+
+    person_ids, person_names, person_births = [], [], []
+    movie_ids, movie_titles, movie_years = [], [], []
+    star_people, star_movies = array("i"), array("i")
+    person_index, movie_index = None, None
+
+    # Files are parsed at the same time, so each file's seconds run
+    # from the submission of its first chunk to the result of its last
+    started = time.perf_counter()
+    first_submitted = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        tasks = iter(tasks)
+
+        def submit():
+            task = next(tasks, None)
+            if task is not None:
+                name, start, end = task
+                first_submitted.setdefault(name, time.perf_counter())
+                future = pool.submit(
+                    parse_chunk, paths[name], start, end, columns[name]
+                )
+                pending.append((task, future))
+
+        for _ in range(2 * workers):
+            submit()
+
+        while pending:
+            (name, start, end), future = pending.popleft()
+            rows = future.result()
+            submit()
+
+            if name == "people.csv":
+                person_ids += rows[0]
+                person_names += rows[1]
+                person_births += rows[2]
+            elif name == "movies.csv":
+                movie_ids += rows[0]
+                movie_titles += rows[1]
+                movie_years += rows[2]
+            else:
+                if person_index is None:
+                    person_index = {p: i for i, p in enumerate(person_ids)}
+                    movie_index = {m: i for i, m in enumerate(movie_ids)}
+                for person_id, movie_id in zip(rows[0], rows[1]):
+                    person = person_index.get(person_id)
+                    movie = movie_index.get(movie_id)
+                    if person is not None and movie is not None:
+                        star_people.append(person)
+                        star_movies.append(movie)
+
+            stats[name]["rows"] += len(rows[0])
+            stats[name]["bytes"] += end - start
+            stats[name]["seconds"] = (
+                time.perf_counter() - first_submitted[name]
+            )
+
+    graph = CompactGraph.from_edges(
+        person_ids, person_names, person_births,
+        movie_ids, movie_titles, movie_years,
+        star_people, star_movies
+    )
+    stats["seconds"] = time.perf_counter() - started
+    stats["peak_rss"] = peak_rss()
+    return graph
+
+
+def header_positions(path, wanted):
+    """
+    Returns the positions of the `wanted` columns in the header
+    line of the CSV file at `path`.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        header = next(csv.reader(f))
+    return [header.index(column) for column in wanted]
+
+
+def chunk_ranges(path, chunk_size):
+    """
+    Returns (start, end) byte ranges covering the rows of the CSV
+    file at `path`, each ending on a line boundary.
+    """
+    ranges = []
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            if f.tell() < size:
+                f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_chunk(path, start, end, positions):
+    """
+    Parses the rows in bytes `start` to `end` of the CSV file at
+    `path`, returning one list per column in `positions`.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    columns = [[] for _ in positions]
+    for row in csv.reader(io.StringIO(text, newline="")):
+        if not row:
+            continue
+        for values, position in zip(columns, positions):
+            values.append(row[position])
+    return columns
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size in bytes of this process
+    and of its largest finished child, or None where the resource
+    module is not available (it is POSIX-only).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * 1024
+
+
+def report(stats):
+    """
+    Returns the lines of a human-readable summary of `stats`
+    from read_graph.
+    """
+    lines = []
+    for name in COLUMNS:
+        file_stats = stats[name]
+        seconds = file_stats["seconds"] or 1e-9
+        lines.append(
+            f"{name:>11}: {file_stats['rows']} rows, "
+            f"{file_stats['rows'] / seconds:,.0f} rows/s, "
+            f"{file_stats['bytes'] / seconds / 2 ** 20:.1f} MB/s"
+        )
+    total = f"{'total':>11}: {stats['seconds']:.2f}s"
+    if stats["peak_rss"] is not None:
+        total += f", peak RSS {stats['peak_rss'] / 2 ** 20:.0f} MiB"
+    lines.append(total)
+    return lines
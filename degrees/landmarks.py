@@ -0,0 +1,169 @@
+import heapq
+import itertools
+import math
+from array import array
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
+
+class LandmarkOracle():
+    """
+    Distance oracle over a CompactGraph.
+
+    Picks `k` landmark people and stores the degrees of separation
+    from each of them to everyone else in compact unsigned 16-bit
+    arrays. By the triangle inequality, those distances give lower
+    and upper bounds on the distance between any two people in O(k),
+    and the lower bound doubles as an admissible A* heuristic (ALT).
+    """
+
+    def __init__(self, graph, k=16):
+        self.graph = graph
+        self.landmarks = []
+        self.distances = []
+        for person in landmark_candidates(graph):
+            if len(self.landmarks) == k:
+                break
+            # Skip people right next to a landmark, whose distances
+            # would add little over that landmark's own
+            if any(d[person] <= 1 for d in self.distances):
+                continue
+            self.landmarks.append(person)
+            self.distances.append(bfs_distances(graph, person))
+
+    def bounds(self, source_id, target_id):
+        """
+        Returns (lower, upper) bounds on the degrees of separation
+        between two person ids. The lower bound is math.inf if the
+        landmarks prove they are not connected, and the upper bound
+        is None if no landmark reaches both of them.
+        """
+        source = self.graph.person_index[source_id]
+        target = self.graph.person_index[target_id]
+        if source == target:
+            return 0, 0
+        lower = self.lower_bound(source, target)
+        upper = None
+        for d in self.distances:
+            if d[source] != UNREACHABLE and d[target] != UNREACHABLE:
+                total = d[source] + d[target]
+                if upper is None or total < upper:
+                    upper = total
+        return lower, upper
+
+    def lower_bound(self, person, target):
+        """
+        Returns a lower bound on the distance between two person
+        indices, or math.inf if they cannot be connected.
+        """
+        best = 0
+        for d in self.distances:
+            a, b = d[person], d[target]
+            if a == UNREACHABLE or b == UNREACHABLE:
+                if a != b:
+                    return math.inf
+                continue
+            if abs(a - b) > best:
+                best = abs(a - b)
+        return best
+
+
+def landmark_candidates(graph):
+    """
+    Returns person indices ordered by how many co-star entries they
+    have across their movies, highest first.
+    """
+    cast_sizes = [
+        graph.movie_offsets[m + 1] - graph.movie_offsets[m]
+        for m in range(len(graph.movie_ids))
+    ]
+    degree = [
+        sum(cast_sizes[m] for m in graph.movies_for(p))
+        for p in range(len(graph.person_ids))
+    ]
+    return sorted(range(len(degree)), key=degree.__getitem__, reverse=True)
+
+
+def bfs_distances(graph, source):
+    """
+    Returns an array of the degrees of separation from person index
+    `source` to every person, with UNREACHABLE for those it cannot
+    reach. Each movie's cast is scanned at most once.
+    """
+    distances = array("H", [UNREACHABLE]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    distances[source] = 0
+    layer = [source]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for person in layer:
+            for movie in graph.movies_for(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in graph.stars_for(movie):
+                    if distances[star] == UNREACHABLE:
+                        distances[star] = depth
+                        next_layer.append(star)
+        layer = next_layer
+    return distances
+
+
+def alt_path(source, target, neighbors, oracle, stats=None):
+    """
+    Returns the shortest path from person index `source` to `target`
+    as a list of (movie, person) index pairs, found by A* search with
+    the landmark lower bound as heuristic.
+
+    If no possible path, returns None.
+    """
+    if oracle.lower_bound(source, target) == math.inf:
+        return None
+
+    parents = {source: None}
+    costs = {source: 0}
+    closed = set()
+    counter = itertools.count()
+
+    # Ties on f are broken towards deeper people, then insertion order
+    heap = [(oracle.lower_bound(source, target), 0, next(counter), source)]
+    while heap:
+        _, _, _, person = heapq.heappop(heap)
+        if person in closed:
+            continue
+        if person == target:
+            return rebuild_path(parents, target)
+        closed.add(person)
+        if stats is not None:
+            stats["expanded"] += 1
+
+        cost = costs[person] + 1
+        for movie, neighbor in neighbors(person):
+            if neighbor in closed or costs.get(neighbor, math.inf) <= cost:
+                continue
+            estimate = oracle.lower_bound(neighbor, target)
+            if estimate == math.inf:
+                continue
+            costs[neighbor] = cost
+            parents[neighbor] = (movie, person)
+            heapq.heappush(
+                heap, (cost + estimate, -cost, next(counter), neighbor)
+            )
+
+    return None
+
+
+def rebuild_path(parents, target):
+    """
+    Follows `parents` back from `target` to build its path.
+    """
+    path = []
+    while parents[target] is not None:
+        movie, parent = parents[target]
+        path.append((movie, target))
+        target = parent
+    path.reverse()
+    return path
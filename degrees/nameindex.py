@@ -0,0 +1,112 @@
+import itertools
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from functools import cached_property
+
+
+class NameIndex():
+    """
+    Index over the lowercase names of a `names` dict for prefix and
+    fuzzy lookups.
+
+    Prefix queries binary-search a sorted list of names. Fuzzy queries
+    score names by the trigrams they share with the query (the Dice
+    coefficient), using an inverted index from each trigram to the
+    names containing it. The trigram index is built on the first fuzzy
+    query, so loads that never need it do not pay for it.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.sorted_names = sorted(names)
+
+    @cached_property
+    def grams(self):
+        """
+        Maps each trigram to an array of positions in `sorted_names`.
+        Also records how many distinct trigrams each name has.
+        """
+        grams = {}
+        self.gram_counts = array("H")
+        for position, name in enumerate(self.sorted_names):
+            name_grams = set(trigrams(name))
+            self.gram_counts.append(len(name_grams))
+            for gram in name_grams:
+                postings = grams.get(gram)
+                if postings is None:
+                    postings = grams[gram] = array("i")
+                postings.append(position)
+        return grams
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` names starting with `prefix`, in order.
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self.sorted_names, prefix)
+        matches = []
+        for name in self.sorted_names[start:start + limit]:
+            if not name.startswith(prefix):
+                break
+            matches.append(name)
+        return matches
+
+    def fuzzy(self, query, limit=10, threshold=0.3):
+        """
+        Returns up to `limit` (name, score) pairs for names sharing
+        trigrams with `query`, best first, where score is the Dice
+        coefficient between their trigram sets. Names scoring below
+        `threshold` are left out.
+        """
+        query_grams = set(trigrams(query.lower()))
+        if not query_grams:
+            return []
+        grams = self.grams
+        shared = Counter(itertools.chain.from_iterable(
+            grams.get(gram, ()) for gram in query_grams
+        ))
+
+        # A name needs at least this many shared trigrams to reach
+        # the threshold, however few trigrams it has itself
+        least = threshold * len(query_grams) / (2 - threshold)
+        scored = []
+        for position, count in shared.items():
+            if count < least:
+                continue
+            score = 2 * count / (len(query_grams) + self.gram_counts[position])
+            if score >= threshold:
+                scored.append((score, self.sorted_names[position]))
+        scored.sort(key=lambda pair: (-pair[0], pair[1]))
+        return [(name, score) for score, name in scored[:limit]]
+
+    def search(self, query, limit=10):
+        """
+        Returns up to `limit` (name, score) pairs ranking an exact
+        match first, then names starting with `query`, then fuzzy
+        matches. Scores are between 0 and 1, and only an exact
+        match scores 1.
+        """
+        query = query.lower().strip()
+        scores = {}
+        if query in self.names:
+            scores[query] = 1.0
+        for name in self.prefix(query, limit):
+            scores.setdefault(name, 0.5 + 0.4 * len(query) / len(name))
+        for name, score in self.fuzzy(query, limit):
+            # Names differing only in repeated letters can share
+            # every trigram with the query
+            score = min(score, 0.99)
+            if score > scores.get(name, 0):
+                scores[name] = score
+        ranked = sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))
+        return ranked[:limit]
+
+
+def trigrams(text):
+    """
+    Returns the trigrams of `text`, padded so that the start and
+    end of the text form trigrams of their own.
+    """
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
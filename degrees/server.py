@@ -0,0 +1,227 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees queries against one loaded graph."
+    )
+    parser.add_argument("-d", "--directory", default="large",
+                        help="data directory to load")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep the graph in compact integer arrays")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes answering queries "
+                             "(POSIX only; elsewhere queries are answered "
+                             "in this process)")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    batch = modes.add_parser(
+        "batch", help="answer tab-separated name pairs, one per line"
+    )
+    batch.add_argument("file", nargs="?", default="-",
+                       help="file of queries, or - for stdin")
+
+    serve = modes.add_parser(
+        "serve", help="answer GET /path?source=...&target=... over HTTP"
+    )
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8050)
+
+    histogram = modes.add_parser(
+        "histogram", help="write how many people sit at each degree "
+                          "of separation from one person, as CSV"
+    )
+    histogram.add_argument("name")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, compact=args.compact)
+    print("Data loaded.", file=sys.stderr)
+
+    if args.mode == "histogram":
+        person_id = degrees.resolve_person(args.name)
+        if person_id is None:
+            sys.exit(f"Person not found or ambiguous: {args.name}")
+        write_histogram(person_id, sys.stdout)
+        return
+
+    with query_pool(args.workers) as pool:
+        if args.mode == "batch":
+            if args.file == "-":
+                run_batch(sys.stdin, sys.stdout, pool)
+            else:
+                with open(args.file, encoding="utf-8") as f:
+                    run_batch(f, sys.stdout, pool)
+        else:
+            run_server(args.host, args.port, pool)
+
+
+def query_pool(workers):
+    """
+    Returns a process pool whose workers are forked from this process
+    after the data is loaded, so they share the read-only graph instead
+    of loading their own copy. For a single worker, or where fork is
+    not available (Windows), returns a stand-in whose context value is
+    None, and queries are answered in this process.
+    """
+    if workers is None or workers <= 1 \
+            or "fork" not in multiprocessing.get_all_start_methods():
+        return InlinePool()
+    pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("fork")
+    )
+
+    # Start every worker now, before any server threads exist
+    for future in [pool.submit(os.getpid) for _ in range(workers)]:
+        future.result()
+    return pool
+
+
+class InlinePool():
+    """
+    Stand-in for a process pool that answers queries in this process.
+    """
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+def answer_query(source_name, target_name):
+    """
+    Returns a JSON-serializable answer for one pair of names: the
+    degrees of separation and each step of the path, or an error.
+    """
+    answer = {"source": source_name, "target": target_name}
+    ids = []
+    for name in (source_name, target_name):
+        person_id = degrees.resolve_person(name)
+        if person_id is None:
+            answer["error"] = f"Person not found or ambiguous: {name}"
+            answer["candidates"] = degrees.candidates_for_name(name)
+            return answer
+        ids.append(person_id)
+
+    path = degrees.shortest_path(ids[0], ids[1], bidirectional=True)
+    if path is None:
+        answer["degrees"] = None
+        return answer
+
+    answer["degrees"] = len(path)
+    answer["path"] = []
+    previous = ids[0]
+    for movie_id, person_id in path:
+        answer["path"].append({
+            "from": degrees.person_name(previous),
+            "to": degrees.person_name(person_id),
+            "movie": degrees.movie_title(movie_id),
+        })
+        previous = person_id
+    return answer
+
+
+def answer_all(queries, pool, window=256):
+    """
+    Yields answers to (source, target) name pairs in order, keeping at
+    most `window` queries in flight so that input is streamed rather
+    than read all at once.
+    """
+    if pool is None:
+        for source, target in queries:
+            yield answer_query(source, target)
+        return
+
+    pending = deque()
+    for source, target in queries:
+        pending.append(pool.submit(answer_query, source, target))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def read_queries(lines):
+    """
+    Yields (source, target) pairs from tab-separated lines,
+    skipping blank lines.
+    """
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        source, _, target = line.partition("\t")
+        yield source.strip(), target.strip()
+
+
+def run_batch(lines, out, pool):
+    """
+    Answers every query in `lines`, writing one JSON object per line.
+    """
+    for answer in answer_all(read_queries(lines), pool):
+        out.write(json.dumps(answer) + "\n")
+        out.flush()
+
+
+def write_histogram(person_id, out):
+    """
+    Writes the degrees histogram of `person_id` to `out` as CSV.
+    """
+    distances, _ = degrees.distances_from(person_id)
+    writer = csv.writer(out)
+    writer.writerow(["degrees", "people"])
+    for depth, count in degrees.degrees_histogram(distances).items():
+        writer.writerow([depth, count])
+
+
+def run_server(host, port, pool):
+    """
+    Serves queries over HTTP until interrupted.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            if url.path != "/path" or "source" not in params \
+                    or "target" not in params:
+                self.send_error(404, "Use /path?source=...&target=...")
+                return
+            source, target = params["source"][0], params["target"][0]
+            if pool is None:
+                answer = answer_query(source, target)
+            else:
+                answer = pool.submit(answer_query, source, target).result()
+
+            body = json.dumps(answer).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving on http://{host}:{port}/path", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import json
+import mmap
+import os
+import sys
+import zlib
+from array import array
+
+from graph import CompactGraph
+
+MAGIC = b"DEGSNAP1"
+VERSION = 2
+
+# CSV files a snapshot is built from
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Integer arrays stored in a snapshot
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_people"]
+
+# String columns stored in a snapshot, each as offsets plus UTF-8 data
+STRINGS = [
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years"
+]
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as UTF-8 bytes plus an array
+    of offsets. Strings are only decoded when they are accessed.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return str(self.data[start:end], "utf-8")
+
+    def __iter__(self):
+        data = self.data
+        start = self.offsets[0]
+        for end in self.offsets[1:]:
+            yield str(data[start:end], "utf-8")
+            start = end
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot file for a data directory.
+    """
+    return os.path.join(directory, ".degrees.snapshot")
+
+
+def source_stats(directory):
+    """
+    Returns the modification time and size of each source CSV file,
+    used to tell whether a snapshot is still current.
+    """
+    stats = {}
+    for name in SOURCES:
+        st = os.stat(os.path.join(directory, name))
+        stats[name] = [st.st_mtime_ns, st.st_size]
+    return stats
+
+
+def write_snapshot(graph, directory, sources=None):
+    """
+    Write `graph` to the snapshot file of `directory`.
+
+    `sources` should be the source_stats of the directory taken before
+    the CSV files were parsed, so that files changing during parsing
+    leave the snapshot stale. The file holds a JSON header followed by
+    the integer arrays and string tables, each aligned to 8 bytes so
+    they can be mapped straight into memory and checked against the
+    CRC-32 stored with it. It is written to a
+    temporary file first and moved into place, so readers never see
+    a partial snapshot.
+    """
+    if sources is None:
+        sources = source_stats(directory)
+    sections = []
+    for name in ARRAYS:
+        sections.append((name, "i", getattr(graph, name).tobytes()))
+    for name in STRINGS:
+        offsets = array("q", [0])
+        data = bytearray()
+        for value in getattr(graph, name):
+            data += value.encode("utf-8")
+            offsets.append(len(data))
+        sections.append((name + ".offsets", "q", offsets.tobytes()))
+        sections.append((name + ".data", "B", bytes(data)))
+
+    layout = {}
+    position = 0
+    for name, typecode, data in sections:
+        layout[name] = [position, len(data), typecode, zlib.crc32(data)]
+        position += padded(len(data))
+    header = json.dumps({
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "sources": sources,
+        "sections": layout,
+    }).encode("utf-8")
+
+    path = snapshot_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(bytes(padded(f.tell()) - f.tell()))
+        for _, _, data in sections:
+            f.write(data)
+            f.write(bytes(padded(len(data)) - len(data)))
+    os.replace(temporary, path)
+
+
+def load_snapshot(directory):
+    """
+    Returns a CompactGraph mapped from the snapshot file of
+    `directory`, or None if there is no snapshot, it cannot be parsed,
+    or the CSV files have changed since it was written.
+    """
+    path = snapshot_path(directory)
+    try:
+        with open(path, "rb") as f:
+            contents = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    # A truncated or garbled snapshot is treated like a stale one, so
+    # the CSV files are parsed again and the snapshot rewritten
+    try:
+        return parse_snapshot(memoryview(contents), directory)
+    except (ValueError, TypeError, KeyError, IndexError, OSError):
+        return None
+
+
+def parse_snapshot(view, directory):
+    """
+    Returns a CompactGraph over the snapshot contents `view`, or None
+    if it is for another version or platform or the CSV files of
+    `directory` have changed. Raises ValueError if the layout does not
+    fit the file or a section fails its checksum.
+    """
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        return None
+    length = int.from_bytes(view[len(MAGIC):len(MAGIC) + 8], "little")
+    start = len(MAGIC) + 8
+    if start + length > len(view):
+        raise ValueError("snapshot header is truncated")
+    header = json.loads(bytes(view[start:start + length]))
+    if (header["version"] != VERSION
+            or header["byteorder"] != sys.byteorder
+            or header["sources"] != source_stats(directory)):
+        return None
+
+    base = padded(start + length)
+    sections = {}
+    for name, (offset, size, typecode, crc) in header["sections"].items():
+        if offset < 0 or size < 0 or base + offset + size > len(view):
+            raise ValueError(f"snapshot section {name} is truncated")
+        section = view[base + offset:base + offset + size]
+        if zlib.crc32(section) != crc:
+            raise ValueError(f"snapshot section {name} is corrupt")
+        sections[name] = section.cast(typecode)
+
+    columns = {
+        name: StringTable(sections[name + ".offsets"],
+                          sections[name + ".data"])
+        for name in STRINGS
+    }
+    arrays = {name: sections[name] for name in ARRAYS}
+    if (len(arrays["person_offsets"]) != len(columns["person_ids"]) + 1
+            or len(arrays["movie_offsets"]) != len(columns["movie_ids"]) + 1):
+        raise ValueError("snapshot arrays do not match")
+    return CompactGraph(**columns, **arrays)
+
+
+def padded(size):
+    """
+    Rounds `size` up to a multiple of 8 bytes.
+    """
+    return (size + 7) // 8 * 8
@@ -1,3 +1,7 @@
+import threading
+from collections import OrderedDict, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +40,128 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Frontier backed by a deque, with a count of the states it holds
+    and a set of states already explored, so that adding, removing
+    and membership checks all take constant time.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+        self.explored = set()
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.pop()
+            count = self.states[node.state] - 1
+            if count:
+                self.states[node.state] = count
+            else:
+                del self.states[node.state]
+            return node
+
+    def pop(self):
+        return self.frontier.pop()
+
+    def mark_explored(self, state):
+        self.explored.add(state)
+
+    def is_explored(self, state):
+        return state in self.explored
+
+    def seen(self, state):
+        """
+        Returns True if `state` is waiting in the frontier or
+        has already been explored.
+        """
+        return state in self.states or state in self.explored
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def pop(self):
+        return self.frontier.popleft()
+
+
+class LRUCache():
+    """
+    Least-recently-used cache bounded by the total size of its values,
+    as measured by `sizeof`, rather than by the number of entries.
+    Values larger than the whole cache are computed but not stored.
+    """
+
+    def __init__(self, max_size, sizeof=len):
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        Returns the cached value for `key`, calling `compute(key)`
+        and caching the result on a miss. Safe to call from several
+        threads; `compute` runs outside the lock, so two threads
+        missing the same key may both compute it.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry[0]
+            self.misses += 1
+
+        value = compute(key)
+        size = self.sizeof(value)
+        if size > self.max_size:
+            return value
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= evicted
+        return value
+
+    def invalidate(self, key=None):
+        """
+        Drops `key` from the cache, or every entry if `key` is None.
+        """
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+                self.size = 0
+            elif key in self.entries:
+                _, size = self.entries.pop(key)
+                self.size -= size
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,130 @@
+import argparse
+import random
+import time
+
+import heredity
+import inference
+
+FAMILIES = ["data/family0.csv", "data/family1.csv", "data/family2.csv"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check exact inference against enumeration on the "
+                    "sample families, and time it on synthetic pedigrees."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[100, 300, 1000],
+                        help="numbers of people to generate")
+    parser.add_argument("--observed", type=float, default=0.5,
+                        help="fraction of people whose trait is known")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--enumerate", type=int, nargs="*", metavar="SIZE",
+                        help="also compare enumeration throughput on the "
+                             "sample families and synthetic pedigrees of "
+                             "these sizes")
+    args = parser.parse_args()
+
+    for filename in FAMILIES:
+        compare_family(filename)
+    if args.enumerate is not None:
+        for filename in FAMILIES:
+            compare_enumeration(filename, heredity.load_data(filename))
+        for size in args.enumerate:
+            people = synthetic_pedigree(size, args.observed, args.seed)
+            compare_enumeration(f"{size} people", people)
+    for size in args.sizes:
+        people = synthetic_pedigree(size, args.observed, args.seed)
+        start = time.perf_counter()
+        inference.infer(people)
+        elapsed = time.perf_counter() - start
+        print(f"{size} people: inference in {elapsed:.3f}s")
+
+
+def synthetic_pedigree(size, observed, seed, cousins=0.05):
+    """
+    Returns a people dict like heredity.load_data of `size` people over
+    several generations. Most family members have children with
+    someone from outside the family, but a fraction `cousins` of the
+    couples are two relatives, which closes loops in the pedigree as
+    in real ones.
+    """
+    rng = random.Random(seed)
+    people = {}
+
+    def add(mother=None, father=None):
+        name = f"p{len(people)}"
+        trait = rng.choice([True, False]) if rng.random() < observed else None
+        people[name] = {
+            "name": name, "mother": mother, "father": father, "trait": trait
+        }
+        return name
+
+    generation = [add() for _ in range(min(size, 4))]
+    while len(people) < size:
+        rng.shuffle(generation)
+        children = []
+        while generation and len(people) < size:
+            parent = generation.pop()
+            if generation and rng.random() < cousins:
+                spouse = generation.pop()
+            else:
+                spouse = add()
+            for _ in range(rng.randint(0, 4)):
+                if len(people) < size:
+                    children.append(add(parent, spouse))
+        generation = children or [add()]
+    return people
+
+
+def compare_family(filename):
+    """
+    Prints the time enumeration and inference take on `filename`, and
+    the largest difference between their probabilities.
+    """
+    people = heredity.load_data(filename)
+    start = time.perf_counter()
+    expected = heredity.enumerate_probabilities(people)
+    enumerated = time.perf_counter() - start
+    start = time.perf_counter()
+    inferred = inference.infer(people)
+    elapsed = time.perf_counter() - start
+    print(f"{filename}: enumeration {enumerated:.3f}s, "
+          f"inference {elapsed:.3f}s, max difference "
+          f"{max_difference(expected, inferred):.2e}")
+
+
+def compare_enumeration(name, people):
+    """
+    Prints the joint probabilities evaluated per second by the
+    enumeration loop and by evidence-pruned enumeration, and the
+    largest difference between their probabilities.
+    """
+    unknown = sum(1 for person in people if people[person]["trait"] is None)
+    combinations = 3 ** len(people) * 2 ** unknown
+    print(f"{name}: {combinations:,} combinations")
+    results = []
+    for engine, enumerate_ in (("loop", heredity.enumerate_probabilities),
+                               ("pruned", heredity.enumerate_pruned)):
+        start = time.perf_counter()
+        results.append(enumerate_(people))
+        elapsed = time.perf_counter() - start
+        print(f"  {engine:>6}: {elapsed:8.3f}s, "
+              f"{combinations / elapsed:12,.0f} combinations/s")
+    print(f"  max difference {max_difference(*results):.2e}")
+
+
+def max_difference(expected, actual):
+    """
+    Returns the largest difference between two sets of probabilities.
+    """
+    return max(
+        abs(expected[person][field][value] - actual[person][field][value])
+        for person in expected
+        for field in expected[person]
+        for value in expected[person][field]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -44,6 +44,19 @@ def main():
         sys.exit("Usage: python heredity.py data.csv")
     people = load_data(sys.argv[1])
 
+    probabilities = enumerate_pruned(people)
+
+    # Print results
+    print_probabilities(people, probabilities)
+
+
+def enumerate_probabilities(people):
+    """
+    Return the gene and trait distribution of each person in `people`,
+    by summing the joint probability of every assignment of genes and
+    traits that agrees with the known traits.
+    """
+
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {
@@ -83,8 +96,13 @@ def main():
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
+    return probabilities
 
-    # Print results
+
+def print_probabilities(people, probabilities):
+    """
+    Print the gene and trait distribution of each person.
+    """
     for person in people:
         print(f"{person}:")
         for field in probabilities[person]:
@@ -94,6 +112,101 @@ def main():
                 print(f"    {value}: {p:.4f}")
 
 
+def enumerate_pruned(people):
+    """
+    Return the same distributions as `enumerate_probabilities`, summing
+    over the assignments produced by `assignments` with the joint
+    probabilities looked up from `person_tables`.
+    """
+    names = list(people)
+    parents, tables = person_tables(people)
+    genes_total = [[0.0, 0.0, 0.0] for _ in names]
+    traits_total = [[0.0, 0.0] for _ in names]
+
+    for genes, traits in assignments(people):
+        p = 1.0
+        for i, gene in enumerate(genes):
+            parent = parents[i]
+            row = 0 if parent is None \
+                else genes[parent[0]] * 3 + genes[parent[1]]
+            p *= tables[i][row][gene][traits[i]]
+        for i, gene in enumerate(genes):
+            genes_total[i][gene] += p
+            traits_total[i][traits[i]] += p
+
+    probabilities = {
+        name: {
+            "gene": {2: genes_total[i][2], 1: genes_total[i][1],
+                     0: genes_total[i][0]},
+            "trait": {True: traits_total[i][True],
+                      False: traits_total[i][False]}
+        }
+        for i, name in enumerate(names)
+    }
+    normalize(probabilities)
+    return probabilities
+
+
+def assignments(people):
+    """
+    Generate every (genes, traits) assignment that agrees with the known
+    traits, as tuples in the order of `people`: gene counts, and traits
+    as booleans. Known traits are fixed, so inconsistent assignments
+    are never produced.
+    """
+    choices = [
+        (True, False) if people[person]["trait"] is None
+        else (people[person]["trait"],)
+        for person in people
+    ]
+    for genes in itertools.product((0, 1, 2), repeat=len(people)):
+        for traits in itertools.product(*choices):
+            yield genes, traits
+
+
+def person_tables(people):
+    """
+    Return the parent indices of each person in the order of `people`,
+    as a (mother, father) pair or None, and a table for each person
+    where tables[i][row][gene][trait] is the probability of their gene
+    and trait. For people with parents, `row` is their mother's gene
+    count times 3 plus their father's; for others it is always 0.
+    """
+    index = {person: i for i, person in enumerate(people)}
+    parents = []
+    tables = []
+    for person in people:
+        mother, father = people[person]["mother"], people[person]["father"]
+        if mother is None:
+            parents.append(None)
+            rows = [[PROBS["gene"][gene] for gene in range(3)]]
+        else:
+            parents.append((index[mother], index[father]))
+            rows = [
+                child_gene_probabilities(m, f)
+                for m, f in itertools.product(range(3), repeat=2)
+            ]
+        tables.append([
+            [{trait: row[gene] * PROBS["trait"][gene][trait]
+              for trait in (True, False)}
+             for gene in range(3)]
+            for row in rows
+        ])
+    return parents, tables
+
+
+def child_gene_probabilities(mother, father):
+    """
+    Return the probabilities of a child having 0, 1 and 2 copies of the
+    gene, given the gene counts of their mother and father.
+    """
+    # Chance of a parent with each gene count passing the gene on
+    mutation = PROBS["mutation"]
+    passes = [mutation, 0.5, 1 - mutation]
+    pm, pf = passes[mother], passes[father]
+    return [(1 - pm) * (1 - pf), pm * (1 - pf) + pf * (1 - pm), pm * pf]
+
+
 def load_data(filename):
     """
     Load gene and trait data from a file into a dictionary.
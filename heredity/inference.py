@@ -0,0 +1,247 @@
+import itertools
+import sys
+
+from heredity import PROBS, child_gene_probabilities, load_data, \
+    print_probabilities
+
+# Number of values of a gene variable: 0, 1 or 2 copies
+GENES = 3
+
+
+class Factor():
+    """
+    Non-negative function of some gene variables, stored as a flat list
+    of values indexed by the variables' gene counts in base 3, with the
+    first variable most significant.
+    """
+
+    def __init__(self, variables, values):
+        self.variables = tuple(variables)
+        self.values = values
+
+    def strides(self, variables):
+        """
+        Returns the index step of this factor for each of `variables`,
+        which must include all of its own.
+        """
+        step = {}
+        size = 1
+        for variable in reversed(self.variables):
+            step[variable] = size
+            size *= GENES
+        return [step.get(variable, 0) for variable in variables]
+
+    def expand(self, variables):
+        """
+        Returns this factor's values over the assignments of `variables`.
+        """
+        strides = self.strides(variables)
+        values = self.values
+        return [
+            values[sum(g * s for g, s in zip(genes, strides))]
+            for genes in itertools.product(range(GENES),
+                                           repeat=len(variables))
+        ]
+
+    def sum_out(self, variables):
+        """
+        Returns the factor over `variables` left by summing out the rest,
+        normalized to sum to 1 so that messages never underflow.
+        """
+        target = Factor(variables, None)
+        strides = target.strides(self.variables)
+        values = [0.0] * GENES ** len(variables)
+        for genes, p in zip(itertools.product(range(GENES),
+                                              repeat=len(self.variables)),
+                            self.values):
+            values[sum(g * s for g, s in zip(genes, strides))] += p
+        total = sum(values)
+        if total > 0:
+            values = [p / total for p in values]
+        target.values = values
+        return target
+
+
+def multiply(factors, variables):
+    """
+    Returns the product of `factors` as a factor over `variables`.
+    """
+    values = [1.0] * GENES ** len(variables)
+    for factor in factors:
+        values = [p * q for p, q in zip(values, factor.expand(variables))]
+    return Factor(variables, values)
+
+
+def divide(numerator, denominator):
+    """
+    Returns `numerator` divided by `denominator`, whose variables must
+    be among the numerator's, taking 0 / 0 to be 0.
+    """
+    values = [
+        p / q if q else 0.0
+        for p, q in zip(numerator.values,
+                        denominator.expand(numerator.variables))
+    ]
+    return Factor(numerator.variables, values)
+
+
+def person_factor(people, person):
+    """
+    Returns the factor for the gene of `person` given their parents'
+    genes, times the probability of their trait if it is known.
+    """
+    trait = people[person]["trait"]
+    likelihood = [
+        1.0 if trait is None else PROBS["trait"][gene][trait]
+        for gene in range(GENES)
+    ]
+    mother, father = people[person]["mother"], people[person]["father"]
+    if mother is None:
+        return Factor((person,), [
+            PROBS["gene"][gene] * likelihood[gene] for gene in range(GENES)
+        ])
+
+    values = []
+    for m, f in itertools.product(range(GENES), repeat=2):
+        child = child_gene_probabilities(m, f)
+        values.extend(child[gene] * likelihood[gene] for gene in range(GENES))
+    return Factor((mother, father, person), values)
+
+
+def elimination_order(factors):
+    """
+    Returns an order in which to eliminate the variables of `factors`,
+    greedily picking the variable whose elimination adds the fewest
+    edges between its neighbors, then the one with fewest neighbors.
+    Each step only rescores the variables near the one eliminated.
+    """
+    neighbors = {}
+    for factor in factors:
+        for variable in factor.variables:
+            neighbors.setdefault(variable, set()).update(factor.variables)
+    for variable in neighbors:
+        neighbors[variable].discard(variable)
+    position = {variable: i for i, variable in enumerate(neighbors)}
+
+    def score(variable):
+        adjacent = list(neighbors[variable])
+        fill = sum(
+            1 for a, b in itertools.combinations(adjacent, 2)
+            if b not in neighbors[a]
+        )
+        return (fill, len(adjacent), position[variable])
+
+    scores = {variable: score(variable) for variable in neighbors}
+    order = []
+    while scores:
+        variable = min(scores, key=scores.get)
+        order.append(variable)
+        del scores[variable]
+        adjacent = neighbors.pop(variable)
+        for a in adjacent:
+            neighbors[a].discard(variable)
+            neighbors[a].update(adjacent - {a})
+        changed = set(adjacent)
+        for a in adjacent:
+            changed.update(neighbors[a])
+        for a in changed:
+            scores[a] = score(a)
+    return order
+
+
+def infer(people):
+    """
+    Return the gene and trait distribution of each person in `people`,
+    shaped like heredity.enumerate_probabilities.
+
+    The pedigree is compiled into one factor per person, and variable
+    elimination in `elimination_order` is run over a clique tree: each
+    eliminated variable gets a cluster of itself and its neighbors at
+    that point, whose message goes to the cluster of the next variable
+    eliminated from it. One pass up the tree and one back down leaves
+    every cluster holding the joint distribution of its variables, so
+    all marginals come from a single run. The cost grows with the
+    number of people times 3 to the size of the largest cluster,
+    rather than exponentially in the number of people.
+    """
+    factors = [person_factor(people, person) for person in people]
+    order = elimination_order(factors)
+    rank = {variable: i for i, variable in enumerate(order)}
+
+    # Build the clusters by simulating elimination on the moral graph
+    neighbors = {variable: set() for variable in order}
+    for factor in factors:
+        for variable in factor.variables:
+            neighbors[variable].update(factor.variables)
+    scopes, parent = {}, {}
+    for variable in order:
+        adjacent = neighbors.pop(variable) - {variable}
+        scopes[variable] = (variable,) + tuple(
+            sorted(adjacent, key=rank.get)
+        )
+        parent[variable] = scopes[variable][1] if adjacent else None
+        for a in adjacent:
+            neighbors[a].discard(variable)
+            neighbors[a].update(adjacent - {a})
+
+    # Each factor goes to the cluster of its first variable eliminated
+    assigned = {variable: [] for variable in order}
+    for factor in factors:
+        assigned[min(factor.variables, key=rank.get)].append(factor)
+    potentials = {
+        variable: multiply(assigned[variable], scopes[variable])
+        for variable in order
+    }
+
+    # Upward pass, in elimination order
+    children = {variable: [] for variable in order}
+    upward = {}
+    for variable in order:
+        cluster = multiply(
+            [potentials[variable]]
+            + [upward[child] for child in children[variable]],
+            scopes[variable]
+        )
+        if parent[variable] is not None:
+            upward[variable] = cluster.sum_out(scopes[variable][1:])
+            children[parent[variable]].append(variable)
+
+    # Downward pass, in reverse, dividing out each child's own message
+    beliefs = {}
+    downward = {}
+    for variable in reversed(order):
+        incoming = [upward[child] for child in children[variable]]
+        if parent[variable] is not None:
+            incoming.append(downward[variable])
+        belief = multiply([potentials[variable]] + incoming,
+                          scopes[variable])
+        beliefs[variable] = belief
+        for child in children[variable]:
+            downward[child] = divide(belief, upward[child]).sum_out(
+                scopes[child][1:]
+            )
+
+    probabilities = {}
+    for person in people:
+        gene = beliefs[person].sum_out((person,)).values
+        trait = people[person]["trait"]
+        if trait is None:
+            p = sum(gene[g] * PROBS["trait"][g][True] for g in range(GENES))
+        else:
+            p = float(trait)
+        probabilities[person] = {
+            "gene": {2: gene[2], 1: gene[1], 0: gene[0]},
+            "trait": {True: p, False: 1 - p},
+        }
+    return probabilities
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python inference.py data.csv")
+    people = load_data(sys.argv[1])
+    print_probabilities(people, infer(people))
+
+
+if __name__ == "__main__":
+    main()
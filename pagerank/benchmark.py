@@ -0,0 +1,278 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+import incremental
+import pagerank
+import personalized
+import solvers
+import sparse
+
+DAMPING = pagerank.DAMPING
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark PageRank iteration on synthetic corpora."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000, 1_000_000],
+                        help="numbers of pages to generate")
+    parser.add_argument("--links", type=int, default=10,
+                        help="average number of links per page")
+    parser.add_argument("--sample", type=int, default=50,
+                        help="pages timed with links_to, to extrapolate "
+                             "a full sweep")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="also time parallel sampling on 1 to N "
+                             "processes")
+    parser.add_argument("--samples", type=int, default=10_000_000,
+                        help="samples taken when timing parallel sampling")
+    parser.add_argument("--incremental", type=int, metavar="PAGES",
+                        help="also time updating the ranks after changing "
+                             "the links of this many pages")
+    parser.add_argument("--solvers", action="store_true",
+                        help="compare iterations to converge for each "
+                             "solver on corpus0-2 and the synthetic corpora")
+    parser.add_argument("--tolerance", type=float, default=1e-8,
+                        help="largest change at which solvers stop")
+    parser.add_argument("--personalized", type=int, nargs="+",
+                        metavar="SETS",
+                        help="also time personalized PageRank for these "
+                             "numbers of seed sets at once")
+    parser.add_argument("--top", type=int, metavar="K",
+                        help="also compare finding the top K pages with "
+                             "early termination to full convergence")
+    args = parser.parse_args()
+
+    if args.solvers:
+        for directory in ["corpus0", "corpus1", "corpus2"]:
+            compare_solvers(directory, pagerank.crawl(directory),
+                            args.tolerance)
+    for size in args.sizes:
+        corpus = synthetic_corpus(size, args.links, args.seed)
+        compare_iteration(corpus, args.sample)
+        if args.workers:
+            compare_workers(corpus, args.samples, args.workers, args.seed)
+        if args.solvers:
+            compare_solvers(f"{size} pages", corpus, args.tolerance)
+        if args.incremental:
+            compare_incremental(corpus, args.incremental, args.seed)
+        if args.top:
+            compare_top(corpus, args.top, args.tolerance)
+        if args.personalized:
+            compare_personalized(corpus, args.personalized, args.seed)
+
+
+def synthetic_corpus(size, links, seed):
+    """
+    Returns a corpus dict of `size` pages, each linking to a random
+    number of other pages averaging `links`.
+    """
+    rng = random.Random(seed)
+    pages = [f"{i}.html" for i in range(size)]
+    corpus = {}
+    for page in pages:
+        count = min(int(rng.expovariate(1 / links)), size - 1)
+        corpus[page] = set(rng.sample(pages, count)) - {page}
+    return corpus
+
+
+def sweep_links_to(corpus, ranks, sample):
+    """
+    Returns the time one iteration would take computing inbound links
+    with `links_to`, extrapolated from `sample` pages since a full
+    sweep is quadratic in the number of pages.
+    """
+    pages = list(corpus)[:sample]
+    start = time.perf_counter()
+    for page in pages:
+        total = 0
+        for link in pagerank.links_to(corpus, page):
+            total += ranks[link] / len(corpus[link])
+    return (time.perf_counter() - start) * len(corpus) / len(pages)
+
+
+def sweep_inbound(corpus, inbound, ranks):
+    """
+    Returns the time taken by one iteration using the inbound index.
+    """
+    n = len(corpus)
+    start = time.perf_counter()
+    spread = sum(ranks[page] for page in corpus if not corpus[page]) / n
+    new = {}
+    for page in ranks:
+        total = spread
+        for link in inbound[page]:
+            total += ranks[link] / len(corpus[link])
+        new[page] = (1 - DAMPING) / n + DAMPING * total
+    return time.perf_counter() - start
+
+
+def sweep_sparse(matrix):
+    """
+    Returns the time taken by one iteration of the sparse engine.
+    """
+    ranks = np.full(len(matrix.pages), 1 / len(matrix.pages))
+    start = time.perf_counter()
+    matrix.step(ranks, DAMPING)
+    return time.perf_counter() - start
+
+
+def compare_iteration(corpus, sample):
+    """
+    Prints the time to build each index and the time per iteration
+    with links_to, with the inbound index and with the sparse engine.
+    """
+    n = len(corpus)
+    ranks = {page: 1 / n for page in corpus}
+
+    start = time.perf_counter()
+    inbound = pagerank.inbound_links(corpus)
+    inbound_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = sparse.LinkMatrix.from_corpus(corpus)
+    sparse_build = time.perf_counter() - start
+
+    print(f"{n} pages:")
+    print(f"  links_to: {sweep_links_to(corpus, ranks, sample):10.3f}s "
+          f"per iteration (extrapolated)")
+    print(f"   inbound: {sweep_inbound(corpus, inbound, ranks):10.3f}s "
+          f"per iteration, {inbound_build:.3f}s to build")
+    print(f"    sparse: {sweep_sparse(matrix):10.3f}s "
+          f"per iteration, {sparse_build:.3f}s to build")
+
+
+def compare_workers(corpus, samples, workers, seed):
+    """
+    Prints sampling throughput with 1 to `workers` processes, and the
+    largest difference from the single-process estimate.
+    """
+    matrix = sparse.LinkMatrix.from_corpus(corpus)
+    baseline = sparse.sample_pagerank(
+        None, DAMPING, samples, seed=seed, matrix=matrix
+    )
+    print(f"  sampling {samples} pages:")
+    for count in range(1, workers + 1):
+        start = time.perf_counter()
+        ranks = sparse.sample_pagerank(
+            None, DAMPING, samples, seed=seed, matrix=matrix, workers=count
+        )
+        elapsed = time.perf_counter() - start
+        difference = max(abs(ranks[page] - baseline[page]) for page in ranks)
+        print(f"    {count:>2} workers: {samples / elapsed:14,.0f} samples/s, "
+              f"max difference {difference:.2e}")
+
+
+def compare_solvers(name, corpus, tolerance):
+    """
+    Prints the iterations and time each solver takes to converge on
+    `corpus`, with the largest error against a tight solution.
+    """
+    matrix = sparse.LinkMatrix.from_corpus(corpus)
+    exact = sparse.iterate_pagerank(None, DAMPING, 1e-14, matrix=matrix)
+    print(f"{name}, solving to {tolerance:g}:")
+    for method in solvers.METHODS:
+        start = time.perf_counter()
+        ranks, trace = solvers.iterate_pagerank(
+            None, DAMPING, method, tolerance, matrix=matrix
+        )
+        elapsed = time.perf_counter() - start
+        error = max(abs(ranks[page] - exact[page]) for page in exact)
+        print(f"  {method:>12}: {len(trace):4} iterations, "
+              f"{elapsed:8.3f}s, max error {error:.2e}")
+
+
+def compare_incremental(corpus, pages, seed):
+    """
+    Prints the time to recompute ranks from scratch, by warm-started
+    iteration and by pushing, after `pages` random pages get new
+    links, with the largest error of each against a tight solution.
+    """
+    rng = random.Random(seed)
+    names = list(corpus)
+    changes = {
+        page: set(rng.sample(names, len(corpus[page]) or 1))
+        for page in rng.sample(names, pages)
+    }
+    state = incremental.RankState.compute(corpus)
+    changed = {**corpus, **changes}
+    exact = sparse.iterate_pagerank(changed, DAMPING, 1e-12)
+
+    print(f"  updating after {pages} pages change:")
+    start = time.perf_counter()
+    ranks = sparse.iterate_pagerank(changed, DAMPING, 1e-8)
+    report_update("cold", start, ranks, exact)
+    for method, tolerance in (("iterate", 1e-8), ("push", 1e-4)):
+        updated = incremental.RankState(
+            {page: set(links) for page, links in corpus.items()},
+            dict(state.ranks)
+        )
+        start = time.perf_counter()
+        updated.update(changes, method=method, tolerance=tolerance)
+        report_update(method, start, updated.ranks, exact)
+
+
+def compare_top(corpus, k, tolerance):
+    """
+    Prints the iterations and time to find the top `k` pages with
+    early termination, against iterating until every rank is within
+    `tolerance` of its limit, and whether both agree.
+    """
+    matrix = sparse.LinkMatrix.from_corpus(corpus)
+    start = time.perf_counter()
+    top, trace = solvers.top_pagerank(
+        None, DAMPING, k, tolerance=tolerance, matrix=matrix
+    )
+    early = time.perf_counter() - start
+
+    # Stop full iteration at the same error bound top_pagerank uses
+    start = time.perf_counter()
+    ranks, full = solvers.iterate_pagerank(
+        None, DAMPING, "jacobi", tolerance * 2 * (1 - DAMPING) / DAMPING,
+        norm="l1", matrix=matrix
+    )
+    converged = time.perf_counter() - start
+    exact = solvers.top_indices(
+        np.array([ranks[page] for page in matrix.pages]), k
+    )
+    agree = [page for page, _ in top] == [matrix.pages[i] for i in exact]
+    print(f"  top {k}: {len(trace)} iterations in {early:.3f}s, "
+          f"full convergence {len(full)} iterations in {converged:.3f}s, "
+          f"{'same' if agree else 'different'} pages")
+
+
+def compare_personalized(corpus, counts, seed):
+    """
+    Prints the time to compute the top 10 pages for each number of
+    random five-page seed sets in `counts`, all in one batch.
+    """
+    rng = random.Random(seed)
+    matrix = sparse.LinkMatrix.from_corpus(corpus)
+    print("  personalized top 10:")
+    for count in counts:
+        seed_sets = [rng.sample(matrix.pages, 5) for _ in range(count)]
+        start = time.perf_counter()
+        personalized.personalized_pagerank(
+            None, DAMPING, seed_sets, matrix=matrix
+        )
+        elapsed = time.perf_counter() - start
+        print(f"    {count:>5} seed sets: {elapsed:8.3f}s, "
+              f"{elapsed / count:.3f}s per set")
+
+
+def report_update(name, start, ranks, exact):
+    """
+    Prints the time since `start` and the largest error of `ranks`.
+    """
+    elapsed = time.perf_counter() - start
+    error = max(abs(ranks[page] - exact[page]) for page in exact)
+    print(f"    {name:>7}: {elapsed:8.3f}s, max error {error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import argparse
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+CHUNK_SIZE = 64 * 2 ** 10
+
+# Text kept from the end of one chunk in case a link continues into
+# the next; links in tags longer than this may be missed
+OVERLAP = 4096
+
+# Files handed to a worker at a time
+BATCH_SIZE = 64
+
+# Names of the pages in the corpus, set in each worker
+corpus_pages = frozenset()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract the link graph of a directory of HTML pages."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("output",
+                        help="file the link graph is written to, one page "
+                             "per line followed by its links, tab-separated")
+    parser.add_argument("--workers", type=int,
+                        help="number of processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    stats = {}
+    corpus = crawl(args.directory, workers=args.workers, output=args.output,
+                   stats=stats, progress=show_progress)
+    print(file=sys.stderr)
+    links = sum(len(links) for links in corpus.values())
+    print(f"{len(corpus)} pages, {links} links in {stats['seconds']:.2f}s")
+
+
+def crawl(directory, workers=None, output=None, chunk_size=CHUNK_SIZE,
+          stats=None, progress=None):
+    """
+    Parse a directory of HTML pages and return a corpus dict like
+    pagerank.crawl, mapping each page to the set of other pages in the
+    corpus it links to.
+
+    Files are read `chunk_size` characters at a time by a pool of
+    `workers` processes, and only links to pages in the corpus are
+    kept, so no file is ever held in memory whole. If `output` is a
+    path, each page is written to it as soon as it is parsed, in the
+    format read by read_links.
+
+    If `stats` is a dict, it is filled with files, bytes and seconds,
+    and `progress` is called with it about once a second while running.
+    """
+    workers = workers or os.cpu_count()
+    if stats is None:
+        stats = {}
+    pages = sorted(
+        entry.name for entry in os.scandir(directory)
+        if entry.name.endswith(".html") and entry.is_file()
+    )
+    stats.update(files=0, bytes=0, seconds=0.0, total_files=len(pages))
+
+    batches = iter([
+        pages[i:i + BATCH_SIZE] for i in range(0, len(pages), BATCH_SIZE)
+    ])
+    corpus = {}
+    out = open(output, "w", encoding="utf-8") if output else None
+    started = time.perf_counter()
+    reported = started
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=set_pages, initargs=(frozenset(pages),)
+        ) as pool:
+            pending = deque()
+
+            def submit():
+                batch = next(batches, None)
+                if batch is not None:
+                    pending.append(pool.submit(
+                        extract_batch, directory, batch, chunk_size
+                    ))
+
+            for _ in range(2 * workers):
+                submit()
+
+            while pending:
+                results = pending.popleft().result()
+                submit()
+                for page, links, size in results:
+                    corpus[page] = links
+                    if out is not None:
+                        out.write("\t".join([page, *sorted(links)]) + "\n")
+                    stats["files"] += 1
+                    stats["bytes"] += size
+
+                now = time.perf_counter()
+                stats["seconds"] = now - started
+                if progress is not None and now - reported >= 1:
+                    progress(stats)
+                    reported = now
+    finally:
+        if out is not None:
+            out.close()
+
+    stats["seconds"] = time.perf_counter() - started
+    if progress is not None:
+        progress(stats)
+    return corpus
+
+
+def set_pages(pages):
+    """
+    Pool initializer recording the names of the pages in the corpus.
+    """
+    global corpus_pages
+    corpus_pages = pages
+
+
+def extract_batch(directory, filenames, chunk_size):
+    """
+    Returns (page, links, bytes) for each of `filenames` in
+    `directory`, keeping only links to pages in the corpus.
+    """
+    results = []
+    for filename in filenames:
+        path = os.path.join(directory, filename)
+        links = extract_links(path, chunk_size) & corpus_pages
+        links.discard(filename)
+        results.append((filename, links, os.stat(path).st_size))
+    return results
+
+
+def extract_links(path, chunk_size=CHUNK_SIZE):
+    """
+    Returns the set of link targets in the HTML file at `path`,
+    reading it `chunk_size` characters at a time.
+    """
+    links = set()
+    tail = ""
+    with open(path) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return links
+            text = tail + chunk
+            end = 0
+            for match in LINK.finditer(text):
+                links.add(match.group(1))
+                end = match.end()
+
+            # Anything after the last match that could begin a link is
+            # scanned again with the next chunk
+            start = text.find("<", max(end, len(text) - OVERLAP))
+            tail = text[start:] if start != -1 else ""
+
+
+def read_links(path):
+    """
+    Returns the corpus dict stored in a link graph file written by
+    crawl.
+    """
+    corpus = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            page, *links = line.rstrip("\n").split("\t")
+            corpus[page] = set(links)
+    return corpus
+
+
+def show_progress(stats):
+    """
+    Prints a one-line progress report of `stats` from crawl.
+    """
+    seconds = stats["seconds"] or 1e-9
+    print(
+        f"\r{stats['files']}/{stats['total_files']} files, "
+        f"{stats['files'] / seconds:,.0f} files/s, "
+        f"{stats['bytes'] / seconds / 2 ** 20:.1f} MB/s",
+        end="", file=sys.stderr, flush=True
+    )
+
+
+if __name__ == "__main__":
+    main()
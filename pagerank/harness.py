@@ -0,0 +1,295 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import crawler
+import pagerank
+import solvers
+import sparse
+
+DAMPING = pagerank.DAMPING
+
+# Kinds of synthetic graph, as keyword arguments to synthetic_graph
+GRAPHS = {
+    "power-law": {},
+    "dangling": {"dangling": 0.2},
+    "components": {"components": 4},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the PageRank engines on synthetic web graphs, "
+                    "check that they agree, and write the results as JSON."
+    )
+    parser.add_argument("--pages", type=int, nargs="+", default=[1000, 10000],
+                        help="numbers of pages to generate")
+    parser.add_argument("--graphs", nargs="+", choices=GRAPHS,
+                        default=list(GRAPHS), help="kinds of graph")
+    parser.add_argument("--links", type=float, default=8,
+                        help="average number of links per page")
+    parser.add_argument("--samples", type=int, default=100_000,
+                        help="pages sampled by the sampling engines")
+    parser.add_argument("--slow-limit", type=int, default=2000,
+                        help="largest graph to run the pure-Python sampler "
+                             "on, which takes pagerank.SAMPLES samples")
+    parser.add_argument("--solve-tolerance", type=float, default=1e-10,
+                        help="tolerance iterative engines are run to")
+    parser.add_argument("--iterate-tolerance", type=float, default=1e-6,
+                        help="largest total variation distance allowed "
+                             "for iterative engines")
+    parser.add_argument("--sample-tolerance", type=float, default=4,
+                        help="standard deviations above the total "
+                             "variation distance expected from sampling "
+                             "noise allowed for sampling engines")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to write JSON results to "
+                                         "(default: standard output)")
+    args = parser.parse_args()
+
+    results = []
+    for pages in args.pages:
+        for kind in args.graphs:
+            corpus = synthetic_graph(
+                pages, args.links, args.seed, **GRAPHS[kind]
+            )
+            for result in run_graph(corpus, args):
+                result.update(graph=kind, pages=pages,
+                              links=sum(len(v) for v in corpus.values()))
+                results.append(result)
+                print_result(result)
+
+    report = {
+        "config": vars(args),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if not all(result["ok"] for result in results):
+        sys.exit(1)
+
+
+def synthetic_graph(size, links, seed, exponent=2.1, dangling=0.0,
+                    components=1):
+    """
+    Returns a corpus dict of `size` pages split into `components`
+    groups that never link to each other.
+
+    Out-degrees follow a power law with exponent `exponent` averaging
+    about `links`, and link targets are drawn from a Zipf-like
+    popularity ranking, so a few pages get most inbound links as on
+    the web. A fraction `dangling` of pages has no links at all.
+    """
+    rng = np.random.default_rng(seed)
+    pages = [f"{i}.html" for i in range(size)]
+    corpus = {}
+    bounds = np.linspace(0, size, components + 1).astype(np.int64)
+    for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        count = end - start
+        popularity = 1 / np.arange(1, count + 1)
+        popularity /= popularity.sum()
+        order = start + rng.permutation(count)
+
+        # Pareto degrees with the given exponent, scaled to the mean
+        degrees = rng.pareto(exponent - 1, size=count) + 1
+        degrees *= links / degrees.mean()
+        degrees = np.minimum(degrees.astype(np.int64), count - 1)
+        degrees[rng.random(count) < dangling] = 0
+
+        targets = order[
+            rng.choice(count, size=degrees.sum(), p=popularity)
+        ].tolist()
+        position = 0
+        for i, degree in zip(range(start, end), degrees.tolist()):
+            linked = {pages[t] for t in targets[position:position + degree]}
+            corpus[pages[i]] = linked - {pages[i]}
+            position += degree
+    return corpus
+
+
+def write_corpus(corpus, directory):
+    """
+    Writes each page of `corpus` as an HTML file in `directory`.
+    """
+    for page, links in corpus.items():
+        anchors = "".join(f'<a href="{link}">{link}</a>\n' for link in links)
+        with open(os.path.join(directory, page), "w") as f:
+            f.write(f"<html><body>\n{anchors}</body></html>\n")
+
+
+def run_graph(corpus, args):
+    """
+    Times every engine on `corpus`, returning one result dict per
+    engine with its task, seconds, errors and whether it agrees.
+    """
+    results = []
+    small = len(corpus) <= args.slow_limit
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_corpus(corpus, directory)
+        crawls = [
+            ("pagerank.crawl", lambda: pagerank.crawl(directory)),
+            ("crawler.crawl", lambda: crawler.crawl(directory)),
+            ("snapshot write", lambda: pagerank.crawl(directory, True)),
+            ("snapshot read", lambda: pagerank.crawl(directory, True)),
+        ]
+        for engine, crawl in crawls:
+            seconds, crawled = timed(crawl)
+            results.append({
+                "task": "crawl", "engine": engine, "seconds": seconds,
+                "ok": crawled == corpus,
+            })
+
+    matrix = sparse.LinkMatrix.from_corpus(corpus)
+    exact = sparse.iterate_pagerank(None, DAMPING, 1e-14, matrix=matrix)
+
+    # pagerank.iterate_pagerank always stops once no rank changes by
+    # more than 0.001, so it is held to the sparse engine stopped by
+    # the same rule rather than to the exact ranks
+    seconds, ranks = timed(lambda: pagerank.iterate_pagerank(corpus, DAMPING))
+    expected = sparse.iterate_pagerank(None, DAMPING, 0.001, matrix=matrix)
+    results.append(compare(
+        "iterate", "pagerank.iterate_pagerank", seconds, ranks, expected,
+        args.iterate_tolerance
+    ))
+
+    tolerance = args.solve_tolerance
+    iterations = [
+        ("sparse.iterate_pagerank",
+         lambda: sparse.iterate_pagerank(corpus, DAMPING, tolerance)),
+    ]
+    for method in solvers.METHODS:
+        iterations.append((
+            f"solvers.{method}",
+            lambda method=method: solvers.iterate_pagerank(
+                corpus, DAMPING, method, tolerance
+            )[0]
+        ))
+    for engine, iterate in iterations:
+        seconds, ranks = timed(iterate)
+        results.append(compare(
+            "iterate", engine, seconds, ranks, exact, args.iterate_tolerance
+        ))
+
+    samplers = [
+        ("sparse.sample_pagerank",
+         lambda: sparse.sample_pagerank(
+             corpus, DAMPING, args.samples, seed=args.seed
+         )),
+    ]
+    if small:
+        samplers.insert(0, (
+            "pagerank.sample_pagerank",
+            lambda: seeded_sample(corpus, args.seed)
+        ))
+    for engine, sample in samplers:
+        seconds, ranks = timed(sample)
+        samples = args.samples if engine.startswith("sparse") \
+            else pagerank.SAMPLES
+        mean, deviation = sampling_noise(matrix, samples, args.seed + 1)
+        result = compare(
+            "sample", engine, seconds, ranks, exact,
+            mean + args.sample_tolerance * deviation
+        )
+        result["expected_variation"] = mean
+        result["variation_deviation"] = deviation
+        result["samples_per_second"] = samples / seconds
+        results.append(result)
+    return results
+
+
+def timed(function):
+    """
+    Returns the seconds taken by calling `function`, and its result.
+    """
+    start = time.perf_counter()
+    value = function()
+    return time.perf_counter() - start, value
+
+
+def compare(task, engine, seconds, ranks, exact, tolerance):
+    """
+    Returns the result dict for `ranks` from `engine`, with its largest
+    error and total variation distance from `exact`. It is ok if the
+    total variation distance is at most `tolerance` and the ranks sum
+    to 1; a per-page error limit would be too loose for large graphs,
+    whose ranks are mostly far below any fixed limit.
+    """
+    errors = [abs(ranks.get(page, 0) - rank) for page, rank in exact.items()]
+    total_variation = sum(errors) / 2
+    return {
+        "task": task,
+        "engine": engine,
+        "seconds": seconds,
+        "max_error": max(errors),
+        "total_variation": total_variation,
+        "rank_sum": sum(ranks.values()),
+        "ok": total_variation <= tolerance
+              and abs(sum(ranks.values()) - 1) < 1e-6,
+    }
+
+
+def seeded_sample(corpus, seed):
+    """
+    Returns pagerank.sample_pagerank of `corpus` with the random
+    module seeded from `seed`, so that runs can be compared.
+    """
+    random.seed(seed)
+    return pagerank.sample_pagerank(corpus, DAMPING, pagerank.SAMPLES)
+
+
+def sampling_noise(matrix, samples, seed, draws=200):
+    """
+    Returns the mean and standard deviation of the total variation
+    distance from the true ranks of a sampled estimate from `samples`
+    pages, with the sampling noise measured rather than assumed.
+
+    Visits by random surfers are correlated, within a walk and across
+    pages (between components, say), so the noise is taken from the
+    spread between the independent batches of surfers in
+    sparse.sample_pagerank_intervals. Each of `draws` error vectors
+    weights the batch deviations by standard normals, which keeps
+    their covariance across pages, and the distances of those draws
+    give the mean and standard deviation.
+    """
+    stats = {}
+    sparse.sample_pagerank_intervals(
+        None, DAMPING, samples, seed=seed, matrix=matrix, stats=stats
+    )
+    frequencies = stats["frequencies"]
+    batches = len(frequencies)
+    deviations = frequencies - frequencies.mean(axis=0)
+    weights = np.random.default_rng(seed).standard_normal((draws, batches))
+    errors = weights @ deviations / math.sqrt(batches * (batches - 1))
+    variation = np.abs(errors).sum(axis=1) / 2
+    return float(variation.mean()), float(variation.std())
+
+
+def print_result(result):
+    """
+    Prints a one-line summary of `result` to standard error.
+    """
+    error = result.get("total_variation")
+    error = "" if error is None else f", total variation {error:.2e}"
+    status = "ok" if result["ok"] else "MISMATCH"
+    print(f"{result['graph']:>10} {result['pages']:>8} "
+          f"{result['task']:>7} {result['engine']:<27} "
+          f"{result['seconds']:9.3f}s{error} {status}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
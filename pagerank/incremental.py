@@ -0,0 +1,192 @@
+import os
+from collections import deque
+
+import pagerank
+import sparse
+
+
+class RankState():
+    """
+    A corpus together with its PageRank values, kept up to date as
+    pages are added, removed or change their links.
+
+    Updates either warm-start power iteration from the previous ranks,
+    or push the change in ranks out from the pages that changed, which
+    only touches the region of the graph the change actually reaches.
+    """
+
+    def __init__(self, corpus, ranks, damping_factor=pagerank.DAMPING):
+        self.corpus = corpus
+        self.ranks = ranks
+        self.damping_factor = damping_factor
+        self.inbound = pagerank.inbound_links(corpus)
+
+    @classmethod
+    def compute(cls, corpus, damping_factor=pagerank.DAMPING,
+                tolerance=1e-10):
+        """
+        Returns the state of `corpus` with ranks computed from scratch.
+        """
+        ranks = sparse.iterate_pagerank(corpus, damping_factor, tolerance)
+        return cls(corpus, ranks, damping_factor)
+
+    @classmethod
+    def load(cls, path, damping_factor=pagerank.DAMPING):
+        """
+        Returns the state saved at `path` by `save`.
+        """
+        corpus, ranks = {}, {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                page, rank, *links = line.rstrip("\n").split("\t")
+                corpus[page] = set(links)
+                ranks[page] = float(rank)
+        return cls(corpus, ranks, damping_factor)
+
+    def save(self, path):
+        """
+        Writes the state to `path`, one page per line followed by its
+        rank and its links, tab-separated.
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            for page, links in self.corpus.items():
+                f.write("\t".join(
+                    [page, repr(self.ranks[page]), *sorted(links)]
+                ) + "\n")
+        os.replace(temporary, path)
+
+    def update(self, changes, method="push", tolerance=1e-4, stats=None):
+        """
+        Apply `changes` to the corpus and update the ranks.
+
+        `changes` maps each added or changed page to its new set of
+        links, and each removed page to None. Links to pages not in
+        the updated corpus are dropped, and links to removed pages are
+        removed from the pages holding them, but a page whose links
+        change for any other reason must be listed.
+
+        With `method` "iterate", power iteration restarts from the old
+        ranks until no value changes by more than `tolerance`. With
+        "push", only residuals larger than `tolerance` / N are pushed
+        on, so the work done is proportional to the size of the change.
+
+        If `stats` is a dict, it is filled with the number of pages
+        changed and the number of iterations or pushes.
+        """
+        changes = self.apply(changes)
+        if stats is not None:
+            stats["changed"] = len(changes)
+        if method == "iterate":
+            self.ranks = sparse.iterate_pagerank(
+                self.corpus, self.damping_factor, tolerance,
+                initial=self.ranks, stats=stats
+            )
+        elif method == "push":
+            self.push(changes, tolerance / len(self.corpus), stats)
+        else:
+            raise ValueError(f"unknown update method: {method}")
+
+    def apply(self, changes):
+        """
+        Updates the corpus and inbound links for `changes`, and
+        returns them as a dict mapping each page whose links changed
+        to its (old, new) links, with None for a missing page.
+        """
+        removed = {page for page, links in changes.items() if links is None}
+        pages = (self.corpus.keys() | changes.keys()) - removed
+
+        applied = {}
+        for page, links in changes.items():
+            if links is not None:
+                links = {link for link in links if link in pages} - {page}
+            applied[page] = (self.corpus.get(page), links)
+        for page in removed:
+            for source in self.inbound.get(page, ()):
+                if source not in applied:
+                    links = self.corpus[source]
+                    applied[source] = (links, links - removed)
+
+        for page, (old, new) in applied.items():
+            for link in old or ():
+                self.inbound[link].discard(page)
+        for page, (old, new) in applied.items():
+            if new is None:
+                self.corpus.pop(page, None)
+                self.inbound.pop(page, None)
+            else:
+                self.corpus[page] = new
+                self.inbound.setdefault(page, set())
+        for page, (old, new) in applied.items():
+            for link in new or ():
+                self.inbound[link].add(page)
+        return applied
+
+    def push(self, changes, threshold, stats=None):
+        """
+        Updates the ranks for `changes` from `apply` by pushing
+        residuals larger than `threshold` along links.
+
+        The residual of a page is how far its rank is from satisfying
+        the PageRank equation. Apart from a part shared by every page,
+        which only rescales the solution and is removed by normalizing
+        at the end, changing a page's links only moves residual between
+        the pages it linked to before and after, and a new page starts
+        with the teleport and dangling share it would have had.
+        """
+        d = self.damping_factor
+        ranks = self.ranks
+        n = len(ranks)
+        dangling = sum(
+            ranks[page] for page, (old, _) in changes.items()
+            if old is not None and not old
+        )
+        for page, links in self.corpus.items():
+            if not links and page not in changes:
+                dangling += ranks[page]
+        new_share = (1 - d) / n + d * dangling / n
+
+        residual = {}
+        for page, (old, new) in changes.items():
+            rank = ranks.get(page)
+            if rank is None:
+                rank = ranks[page] = 0.0
+                residual[page] = residual.get(page, 0.0) + new_share
+            for links, sign in ((old, -1), (new, 1)):
+                if links:
+                    share = sign * d * rank / len(links)
+                    for link in links:
+                        residual[link] = residual.get(link, 0.0) + share
+
+        for page, (_, new) in changes.items():
+            if new is None:
+                del ranks[page]
+                residual.pop(page, None)
+
+        queue = deque(
+            page for page, value in residual.items() if abs(value) > threshold
+        )
+        pushes = 0
+        while queue:
+            page = queue.popleft()
+            value = residual.get(page, 0.0)
+            if abs(value) <= threshold:
+                continue
+            del residual[page]
+            pushes += 1
+            ranks[page] += value
+            links = self.corpus[page]
+            if not links:
+                continue
+            share = d * value / len(links)
+            for link in links:
+                before = residual.get(link, 0.0)
+                residual[link] = before + share
+                if abs(before) <= threshold < abs(before + share):
+                    queue.append(link)
+
+        total = sum(ranks.values())
+        for page in ranks:
+            ranks[page] /= total
+        if stats is not None:
+            stats["pushes"] = pushes
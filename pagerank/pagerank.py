@@ -3,6 +3,8 @@ import random
 import re
 import sys
 
+from snapshot import load_snapshot, source_digest, write_snapshot
+
 DAMPING = 0.85
 SAMPLES = 10000
 
@@ -10,7 +12,7 @@ SAMPLES = 10000
 def main():
     if len(sys.argv) != 2:
         sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
+    corpus = crawl(sys.argv[1], snapshot=True)
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
@@ -21,12 +23,22 @@ def main():
         print(f"  {page}: {ranks[page]:.4f}")
 
 
-def crawl(directory):
+def crawl(directory, snapshot=False):
     """
     Parse a directory of HTML pages and check for links to other pages.
     Return a dictionary where each key is a page, and values are
     a list of all other pages in the corpus that are linked to by the page.
+
+    With `snapshot` set, the link graph is read from the binary
+    snapshot written by an earlier crawl if no HTML file has changed
+    since, and written for the next crawl otherwise.
     """
+    if snapshot:
+        graph = load_snapshot(directory)
+        if graph is not None:
+            return graph.corpus()
+        digest = source_digest(directory)
+
     pages = dict()
 
     # Extract all links from HTML files
@@ -45,6 +57,12 @@ def crawl(directory):
             if link in pages
         )
 
+    if snapshot:
+        try:
+            write_snapshot(pages, directory, digest)
+        except OSError:
+            pass
+
     return pages
 
 
@@ -121,7 +139,22 @@ def links_to(corpus,page):
     return res
 
 
-def iterate_pagerank(corpus, damping_factor):
+def inbound_links(corpus):
+    """
+    Return a dictionary where each key is a page, and values are
+    the set of pages in the corpus that link to it.
+
+    Built once per corpus, so that each iteration can find a page's
+    inbound links without scanning every page as `links_to` does.
+    """
+    inbound = {page: set() for page in corpus}
+    for page, links in corpus.items():
+        for link in links:
+            inbound[link].add(page)
+    return inbound
+
+
+def iterate_pagerank(corpus, damping_factor, inbound=None):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
@@ -129,20 +162,23 @@ def iterate_pagerank(corpus, damping_factor):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
+
+    `inbound` may be passed in if `inbound_links(corpus)` has
+    already been computed.
     """
     
     res = {}
     N = len(corpus)
 
-    corp = {}
-    for i in corpus.items():
-        if i[1]=={}:
-            corp[i[0]]={x for x in corpus}
-        else:
-            corp[i[0]]=i[1]
+    if inbound is None:
+        inbound = inbound_links(corpus)
+
+    # A page with no links is treated as linking to every page,
+    # so its rank is shared evenly across the corpus each iteration
+    dangling = [page for page in corpus if not corpus[page]]
 
 
-    for k in corp.keys():
+    for k in corpus.keys():
         res[k] = 1 / N
 
     update = True
@@ -151,16 +187,14 @@ def iterate_pagerank(corpus, damping_factor):
        
         update = False
         new = {}
-        for i in res.items():
-            p = i[0]
-            sum = 0
+        spread = sum(res[page] for page in dangling) / N
+        for p in res:
+            total = spread
             
-            for l in links_to(corp,p):
-                x = len(corp[l])
-               
-                sum += res[l] / x
+            for l in inbound[p]:
+                total += res[l] / len(corpus[l])
             
-            new[p] = (1 - damping_factor) / N + damping_factor * sum
+            new[p] = (1 - damping_factor) / N + damping_factor * total
         
             #check for update
             
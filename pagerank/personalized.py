@@ -0,0 +1,82 @@
+import numpy as np
+
+from sparse import LinkMatrix
+
+
+def personalized_pagerank(corpus, damping_factor, teleport, top=10,
+                          tolerance=1e-6, max_iter=1000, matrix=None):
+    """
+    Return the `top` pages for each of many personalized PageRanks,
+    computed together by power iteration on a (pages, k) rank matrix.
+
+    `teleport` is either a (pages, k) array whose columns are teleport
+    distributions over pages in `matrix.pages` order, or a list of k
+    seed sets of page names, each teleporting uniformly to its pages.
+    A column stops being updated once none of its values changes by
+    more than `tolerance` in one iteration, so seed sets that converge
+    quickly do not pay for the slow ones.
+
+    `corpus` may be a corpus dict, or None if a prebuilt LinkMatrix
+    is passed as `matrix`. Returns a list with one list per column of
+    up to `top` (page, rank) pairs, highest rank first.
+    """
+    if matrix is None:
+        matrix = LinkMatrix.from_corpus(corpus)
+    if not isinstance(teleport, np.ndarray):
+        teleport = teleport_matrix(matrix, teleport)
+    teleport = teleport / teleport.sum(axis=0)
+
+    # Converged columns are moved out to `result`, and the rest kept
+    # contiguous so each product gathers whole rows
+    result = np.empty_like(teleport)
+    columns = np.arange(teleport.shape[1])
+    ranks = teleport.copy()
+    for _ in range(max_iter):
+        if not len(columns):
+            break
+        new = matrix.step_many(ranks, damping_factor, teleport)
+        done = np.abs(new - ranks).max(axis=0) <= tolerance
+        ranks = new
+        if done.any():
+            result[:, columns[done]] = ranks[:, done]
+            columns = columns[~done]
+            ranks = np.ascontiguousarray(ranks[:, ~done])
+            teleport = np.ascontiguousarray(teleport[:, ~done])
+    result[:, columns] = ranks
+    return top_pages(matrix, result, top)
+
+
+def teleport_matrix(matrix, seed_sets):
+    """
+    Returns a (pages, k) array with one column per seed set, spreading
+    teleports evenly over the pages in that set.
+    """
+    index = {page: i for i, page in enumerate(matrix.pages)}
+    teleport = np.zeros((len(matrix.pages), len(seed_sets)))
+    for column, seeds in enumerate(seed_sets):
+        rows = [index[page] for page in seeds]
+        if not rows:
+            raise ValueError(f"seed set {column} is empty")
+        teleport[rows, column] = 1 / len(rows)
+    return teleport
+
+
+def top_pages(matrix, ranks, top):
+    """
+    Returns up to `top` (page, rank) pairs per column of `ranks`,
+    highest first, sorting only the candidates for each column.
+    """
+    top = min(top, ranks.shape[0])
+    if not top:
+        return [[] for _ in range(ranks.shape[1])]
+    best = np.argpartition(-ranks, top - 1, axis=0)[:top]
+    values = np.take_along_axis(ranks, best, axis=0)
+    order = np.argsort(-values, axis=0, kind="stable")
+    best = np.take_along_axis(best, order, axis=0)
+    values = np.take_along_axis(values, order, axis=0)
+    return [
+        [(matrix.pages[i], rank)
+         for i, rank in zip(best[:, column].tolist(),
+                            values[:, column].tolist())]
+        for column in range(ranks.shape[1])
+    ]
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import mmap
+import os
+import sys
+import zlib
+from array import array
+
+MAGIC = b"PRSNAP01"
+VERSION = 2
+
+# Integer arrays stored in a snapshot: links out of and into each page
+# in CSR form, so page i links to links[offsets[i]:offsets[i + 1]]
+ARRAYS = {
+    "offsets": "q",
+    "links": "i",
+    "inbound_offsets": "q",
+    "inbound_links": "i",
+}
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as UTF-8 bytes plus an array
+    of offsets. Strings are only decoded when they are accessed.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return str(self.data[start:end], "utf-8")
+
+    def __iter__(self):
+        data = self.data
+        start = self.offsets[0]
+        for end in self.offsets[1:]:
+            yield str(data[start:end], "utf-8")
+            start = end
+
+
+class LinkGraph():
+    """
+    Link graph of a corpus mapped from a snapshot file: page names in
+    a string table, and links between page numbers as CSR arrays.
+    """
+
+    def __init__(self, pages, offsets, links, inbound_offsets,
+                 inbound_links):
+        self.pages = pages
+        self.offsets = offsets
+        self.links = links
+        self.inbound_offsets = inbound_offsets
+        self.inbound_links = inbound_links
+
+    def links_for(self, page):
+        """
+        Returns the page numbers linked to by page number `page`.
+        """
+        return self.links[self.offsets[page]:self.offsets[page + 1]]
+
+    def corpus(self):
+        """
+        Returns the graph as a corpus dict like pagerank.crawl.
+        """
+        pages = list(self.pages)
+        return {
+            page: {pages[link] for link in self.links_for(i)}
+            for i, page in enumerate(pages)
+        }
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot file for a corpus directory.
+    """
+    return os.path.join(directory, ".pagerank.snapshot")
+
+
+def source_digest(directory):
+    """
+    Returns a digest of the name, modification time and size of every
+    HTML file in `directory`, used to tell whether a snapshot is still
+    current.
+    """
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".html"):
+            st = entry.stat()
+            entries.append((entry.name, st.st_mtime_ns, st.st_size))
+    entries.sort()
+    return hashlib.sha256(json.dumps(entries).encode("utf-8")).hexdigest()
+
+
+def write_snapshot(corpus, directory, digest=None):
+    """
+    Write the link graph of `corpus` to the snapshot file of
+    `directory`.
+
+    `digest` should be the source_digest of the directory taken
+    before it was crawled, so that files changing during the crawl
+    leave the snapshot stale. The file holds a JSON header followed
+    by the page names and the CSR arrays, each aligned to 8 bytes so
+    they can be mapped straight into memory and checked against the
+    CRC-32 stored with it. It is written to a
+    temporary file first and moved into place, so readers never see
+    a partial snapshot.
+    """
+    if digest is None:
+        digest = source_digest(directory)
+    pages = list(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+
+    arrays = {name: array(typecode) for name, typecode in ARRAYS.items()}
+    inbound = [[] for _ in pages]
+    arrays["offsets"].append(0)
+    for i, page in enumerate(pages):
+        for link in sorted(index[link] for link in corpus[page]):
+            arrays["links"].append(link)
+            inbound[link].append(i)
+        arrays["offsets"].append(len(arrays["links"]))
+    arrays["inbound_offsets"].append(0)
+    for sources in inbound:
+        arrays["inbound_links"].extend(sources)
+        arrays["inbound_offsets"].append(len(arrays["inbound_links"]))
+
+    name_offsets = array("q", [0])
+    names = bytearray()
+    for page in pages:
+        names += page.encode("utf-8")
+        name_offsets.append(len(names))
+
+    sections = [
+        (name, ARRAYS[name], arrays[name].tobytes()) for name in ARRAYS
+    ]
+    sections.append(("pages.offsets", "q", name_offsets.tobytes()))
+    sections.append(("pages.data", "B", bytes(names)))
+
+    layout = {}
+    position = 0
+    for name, typecode, data in sections:
+        layout[name] = [position, len(data), typecode, zlib.crc32(data)]
+        position += padded(len(data))
+    header = json.dumps({
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "sources": digest,
+        "sections": layout,
+    }).encode("utf-8")
+
+    path = snapshot_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(bytes(padded(f.tell()) - f.tell()))
+        for _, _, data in sections:
+            f.write(data)
+            f.write(bytes(padded(len(data)) - len(data)))
+    os.replace(temporary, path)
+
+
+def load_snapshot(directory):
+    """
+    Returns a LinkGraph mapped from the snapshot file of `directory`,
+    or None if there is no snapshot, it cannot be parsed, or any HTML
+    file has been added, removed or changed since it was written.
+    """
+    path = snapshot_path(directory)
+    try:
+        with open(path, "rb") as f:
+            contents = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    # A truncated or garbled snapshot is treated like a stale one, so
+    # the corpus is crawled again and the snapshot rewritten
+    try:
+        return parse_snapshot(memoryview(contents), directory)
+    except (ValueError, TypeError, KeyError, IndexError, OSError):
+        return None
+
+
+def parse_snapshot(view, directory):
+    """
+    Returns a LinkGraph over the snapshot contents `view`, or None if
+    it is for another version or platform or the HTML files of
+    `directory` have changed. Raises ValueError if the layout does not
+    fit the file or a section fails its checksum.
+    """
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        return None
+    length = int.from_bytes(view[len(MAGIC):len(MAGIC) + 8], "little")
+    start = len(MAGIC) + 8
+    if start + length > len(view):
+        raise ValueError("snapshot header is truncated")
+    header = json.loads(bytes(view[start:start + length]))
+    if (header["version"] != VERSION
+            or header["byteorder"] != sys.byteorder
+            or header["sources"] != source_digest(directory)):
+        return None
+
+    base = padded(start + length)
+    sections = {}
+    for name, (offset, size, typecode, crc) in header["sections"].items():
+        if offset < 0 or size < 0 or base + offset + size > len(view):
+            raise ValueError(f"snapshot section {name} is truncated")
+        section = view[base + offset:base + offset + size]
+        if zlib.crc32(section) != crc:
+            raise ValueError(f"snapshot section {name} is corrupt")
+        sections[name] = section.cast(typecode)
+
+    pages = StringTable(sections["pages.offsets"], sections["pages.data"])
+    if (len(sections["offsets"]) != len(pages) + 1
+            or len(sections["inbound_offsets"]) != len(pages) + 1):
+        raise ValueError("snapshot arrays do not match")
+    return LinkGraph(pages, *(sections[name] for name in ARRAYS))
+
+
+def padded(size):
+    """
+    Rounds `size` up to a multiple of 8 bytes.
+    """
+    return (size + 7) // 8 * 8
@@ -0,0 +1,202 @@
+import heapq
+
+import numpy as np
+
+from sparse import LinkMatrix, initial_ranks
+
+METHODS = ["jacobi", "gauss-seidel", "aitken", "quadratic"]
+
+NORMS = {
+    "l1": lambda change: np.abs(change).sum(),
+    "linf": lambda change: np.abs(change).max(),
+}
+
+
+def iterate_pagerank(corpus, damping_factor, method="jacobi", tolerance=0.001,
+                     norm="linf", max_iter=1000, matrix=None, initial=None,
+                     blocks=256, period=10):
+    """
+    Return PageRank values for each page and the convergence trace,
+    solving with `method`:
+
+    - "jacobi" is plain power iteration.
+    - "gauss-seidel" updates ranks in place, so each block of pages
+      already sees the new ranks of the blocks before it. Pages are
+      split into at most `blocks` blocks so that each is updated with
+      one vectorized product; with as many blocks as pages this is
+      classic Gauss-Seidel.
+    - "aitken" and "quadratic" are power iteration with Aitken delta
+      squared or quadratic extrapolation from the last few iterates
+      tried every `period` iterations, and kept only if it is closer
+      to a fixed point than the plain iterate.
+
+    Iteration stops once the change in one iteration, measured with
+    `norm` ("l1" or "linf"), is at most `tolerance`, or after
+    `max_iter` iterations. `initial` is an optional dict of starting
+    ranks, as for sparse.iterate_pagerank.
+
+    Returns (ranks, trace): a dictionary like pagerank.iterate_pagerank,
+    and the list of changes measured after each iteration.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method: {method}")
+    if norm not in NORMS:
+        raise ValueError(f"unknown norm: {norm}")
+    if matrix is None:
+        matrix = LinkMatrix.from_corpus(corpus)
+    ranks = initial_ranks(matrix, initial)
+
+    measure = NORMS[norm]
+    history = [ranks]
+    trace = []
+    ahead = None
+    while len(trace) < max_iter:
+        if method == "gauss-seidel":
+            new = gauss_seidel_sweep(matrix, ranks, damping_factor, blocks)
+        else:
+            new = matrix.step(ranks, damping_factor) if ahead is None \
+                else ahead
+            ahead = None
+            history = history[-3:] + [new]
+            extrapolate = EXTRAPOLATIONS.get(method)
+            if extrapolate and len(history) == 4 \
+                    and (len(trace) + 1) % period == 0:
+                # Keep the extrapolation only if one more step moves
+                # it less than the plain iterate, so it never slows
+                # convergence; that step is reused next iteration
+                candidate = extrapolate(history)
+                following = matrix.step(new, damping_factor)
+                candidate_following = matrix.step(candidate, damping_factor)
+                if measure(candidate_following - candidate) \
+                        < measure(following - new):
+                    new, ahead = candidate, candidate_following
+                else:
+                    ahead = following
+                history = [new]
+        trace.append(float(measure(new - ranks)))
+        ranks = new
+        if trace[-1] <= tolerance:
+            break
+    return matrix.to_dict(ranks), trace
+
+
+def top_pagerank(corpus, damping_factor, k=20, tolerance=1e-10,
+                 max_iter=1000, matrix=None):
+    """
+    Return the `k` pages with the highest PageRank, stopping power
+    iteration as soon as their set and order can no longer change.
+
+    After an iteration that changed the ranks by `delta` in L1 norm,
+    no rank is further than `bound` = d / (1 - d) * delta / 2 from its
+    limit, since each step contracts the error by d and the error sums
+    to zero. Once each of the top k ranks, and the (k + 1)th, are more
+    than 2 * bound apart, the top k and their order are final. Pages
+    with tied ranks can never be separated that way, so iteration also
+    stops once `bound` is at most `tolerance`, or after `max_iter`
+    iterations.
+
+    Returns (top, trace): up to `k` (page, rank) pairs, highest first,
+    and the list of bounds after each iteration.
+    """
+    if matrix is None:
+        matrix = LinkMatrix.from_corpus(corpus)
+    n = len(matrix.pages)
+    k = min(k, n)
+    ranks = np.full(n, 1 / n)
+    trace = []
+    while len(trace) < max_iter:
+        new = matrix.step(ranks, damping_factor)
+        delta = np.abs(new - ranks).sum()
+        ranks = new
+        bound = damping_factor / (1 - damping_factor) * delta / 2
+        trace.append(float(bound))
+
+        if bound <= tolerance:
+            break
+        # The k gaps cannot all exceed 2 * bound before the largest
+        # rank does 2 * k * bound, so only look at the top after that
+        if 2 * k * bound < ranks.max():
+            best = top_indices(ranks, k + 1)
+            if np.all(-np.diff(ranks[best]) > 2 * bound):
+                break
+
+    top = top_indices(ranks, k)
+    return [(matrix.pages[i], float(ranks[i])) for i in top], trace
+
+
+def top_indices(ranks, k):
+    """
+    Returns the indices of the `k` largest values of `ranks`, largest
+    first. Candidates are picked with a partial partition, and only
+    those go through a heap.
+    """
+    k = min(k, len(ranks))
+    if not k:
+        return np.array([], dtype=np.int64)
+    candidates = np.argpartition(ranks, len(ranks) - k)[len(ranks) - k:]
+    best = heapq.nlargest(
+        k, candidates.tolist(), key=lambda i: (ranks[i], -i)
+    )
+    return np.array(best, dtype=np.int64)
+
+
+def gauss_seidel_sweep(matrix, ranks, damping_factor, blocks):
+    """
+    Returns the ranks after one Gauss-Seidel sweep over `blocks`
+    contiguous blocks of pages, normalized to sum to 1.
+    """
+    n = len(matrix.pages)
+    ranks = ranks.copy()
+    degree = np.maximum(matrix.out_degree, 1)
+    dangling = ranks[matrix.dangling].sum()
+    bounds = np.linspace(0, n, min(blocks, n) + 1).astype(np.int64)
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        first, last = matrix.indptr[start], matrix.indptr[end]
+        sources = matrix.indices[first:last]
+        linked = np.bincount(
+            matrix.rows[first:last] - start,
+            weights=ranks[sources] / degree[sources],
+            minlength=end - start
+        )
+        old = ranks[start:end].copy()
+        ranks[start:end] = (1 - damping_factor) / n + damping_factor * (
+            linked + dangling / n
+        )
+        block_dangling = matrix.dangling[start:end]
+        dangling += (ranks[start:end] - old)[block_dangling].sum()
+    return ranks / ranks.sum()
+
+
+def aitken(history):
+    """
+    Returns the Aitken delta squared extrapolation of the last three
+    iterates, falling back to the last iterate wherever the second
+    difference vanishes or the result is not positive.
+    """
+    x0, x1, x2 = history[-3:]
+    second = x2 - 2 * x1 + x0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = x2 - (x2 - x1) ** 2 / second
+    unusable = (np.abs(second) < 1e-15) | ~(result > 0)
+    result[unusable] = x2[unusable]
+    return result / result.sum()
+
+
+def quadratic(history):
+    """
+    Returns the quadratic extrapolation of the last four iterates
+    (Kamvar et al., 2003), which assumes the iterates are a mix of the
+    solution and the next two eigenvectors of the transition matrix.
+    """
+    x0, x1, x2, x3 = history[-4:]
+    y = np.column_stack([x1 - x0, x2 - x0])
+    gamma, *_ = np.linalg.lstsq(y, -(x3 - x0), rcond=None)
+    g1, g2, g3 = gamma[0], gamma[1], 1.0
+    result = (g1 + g2 + g3) * x1 + (g2 + g3) * x2 + g3 * x3
+    if not np.all(np.isfinite(result)) or result.sum() <= 0:
+        return x3
+    result = np.maximum(result, 0)
+    return result / result.sum()
+
+
+EXTRAPOLATIONS = {"aitken": aitken, "quadratic": quadratic}
@@ -0,0 +1,404 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class LinkMatrix():
+    """
+    Link structure of a corpus as a sparse matrix, for computing
+    PageRank with vectorized power iteration.
+
+    Pages are numbered in `pages` order. Inbound links are stored in
+    CSR form: the pages linking to page `i` are
+    `indices[indptr[i]:indptr[i + 1]]`. Together with `out_degree`,
+    this is the column-stochastic transition matrix restricted to
+    pages that have links. Pages without links (`dangling`) are not
+    expanded into links to every page; their rank is spread evenly
+    as a rank-one correction on each iteration instead.
+    """
+
+    def __init__(self, pages, indptr, indices, out_degree):
+        self.pages = pages
+        self.indptr = indptr
+        self.indices = indices
+        self.out_degree = out_degree
+        self.dangling = out_degree == 0
+
+        # Row of each stored link, so a product is a single bincount
+        self.rows = np.repeat(
+            np.arange(len(pages), dtype=np.int32), np.diff(indptr)
+        )
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build the matrix for a corpus dict mapping each page to the
+        set of pages it links to, as returned by pagerank.crawl.
+        """
+        pages = list(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        sources = np.fromiter(
+            (index[page] for page in pages for _ in corpus[page]),
+            dtype=np.int32
+        )
+        targets = np.fromiter(
+            (index[link] for page in pages for link in corpus[page]),
+            dtype=np.int32
+        )
+        return cls.from_edges(pages, sources, targets)
+
+    @classmethod
+    def from_edges(cls, pages, sources, targets):
+        """
+        Build the matrix from parallel arrays of link source and
+        target page numbers. Links are assumed to be distinct.
+        """
+        n = len(pages)
+        sources = np.asarray(sources, dtype=np.int32)
+        targets = np.asarray(targets, dtype=np.int32)
+        order = np.argsort(targets, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=n), out=indptr[1:])
+        out_degree = np.bincount(sources, minlength=n)
+        return cls(pages, indptr, sources[order], out_degree)
+
+    @classmethod
+    def from_snapshot(cls, graph):
+        """
+        Build the matrix over the arrays of a snapshot.LinkGraph
+        without copying them.
+        """
+        indptr = np.frombuffer(graph.inbound_offsets, dtype=np.int64)
+        indices = np.frombuffer(graph.inbound_links, dtype=np.int32)
+        offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+        matrix = cls(graph.pages, indptr, indices, np.diff(offsets))
+        matrix.outbound = (
+            offsets, np.frombuffer(graph.links, dtype=np.int32)
+        )
+        return matrix
+
+    @cached_property
+    def outbound(self):
+        """
+        Outbound links in CSR form, as (indptr, indices) arrays: the
+        pages linked to by page `i` are `indices[indptr[i]:indptr[i + 1]]`.
+        """
+        order = np.argsort(self.indices, kind="stable")
+        indptr = np.zeros(len(self.pages) + 1, dtype=np.int64)
+        np.cumsum(self.out_degree, out=indptr[1:])
+        return indptr, self.rows[order]
+
+    def step(self, ranks, damping_factor):
+        """
+        Returns the ranks after one application of the PageRank
+        update to the rank vector `ranks`.
+        """
+        n = len(self.pages)
+        share = np.divide(
+            ranks, self.out_degree, out=np.zeros_like(ranks),
+            where=~self.dangling
+        )
+        linked = np.bincount(
+            self.rows, weights=share[self.indices], minlength=n
+        )
+        dangling = ranks[self.dangling].sum() / n
+        return (1 - damping_factor) / n + damping_factor * (linked + dangling)
+
+    def step_many(self, ranks, damping_factor, teleport):
+        """
+        Returns the ranks after one application of the personalized
+        PageRank update to each column of the (pages, k) array `ranks`,
+        teleporting according to the matching column of `teleport`.
+
+        Rank on dangling pages is spread like a teleport, so with
+        uniform columns this is the same update as `step`.
+        """
+        degree = np.maximum(self.out_degree, 1)[:, None]
+        share = np.where(self.dangling[:, None], 0, ranks / degree)
+        linked = np.zeros_like(ranks)
+
+        # Sum inbound shares for a block of pages at a time, sized so
+        # the gathered rows stay around 64K values and in cache
+        indptr = self.indptr
+        per_block = max(1, 2 ** 16 // ranks.shape[1])
+        bounds = np.unique(np.append(
+            np.searchsorted(indptr, np.arange(0, indptr[-1], per_block)),
+            len(self.pages)
+        ))
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            first, last = indptr[start], indptr[end]
+            if first == last:
+                continue
+            offsets = indptr[start:end] - first
+            targets = np.flatnonzero(np.diff(indptr[start:end + 1]))
+            linked[start + targets] = np.add.reduceat(
+                share[self.indices[first:last]], offsets[targets], axis=0
+            )
+        dangling = ranks[self.dangling].sum(axis=0)
+        return (1 - damping_factor) * teleport + damping_factor * (
+            linked + teleport * dangling
+        )
+
+    def to_dict(self, ranks):
+        """
+        Returns a rank vector as a dict keyed by page name.
+        """
+        return dict(zip(self.pages, ranks.tolist()))
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=0.001, matrix=None,
+                     initial=None, stats=None):
+    """
+    Return PageRank values for each page by power iteration with
+    sparse matrix-vector products, until no value changes by more
+    than `tolerance` in one iteration.
+
+    `corpus` may be a corpus dict, or None if a prebuilt LinkMatrix
+    is passed as `matrix`. If `initial` is a dict of ranks, such as
+    those of an earlier version of the corpus, iteration starts from
+    it instead of the uniform vector; pages missing from it start at
+    1 / N. If `stats` is a dict, it is filled with the number of
+    iterations. Returns a dictionary like pagerank.iterate_pagerank.
+    """
+    if matrix is None:
+        matrix = LinkMatrix.from_corpus(corpus)
+    ranks = initial_ranks(matrix, initial)
+    iterations = 0
+    while True:
+        new = matrix.step(ranks, damping_factor)
+        iterations += 1
+        change = np.abs(new - ranks).max()
+        ranks = new
+        if change <= tolerance:
+            break
+    if stats is not None:
+        stats["iterations"] = iterations
+    return matrix.to_dict(ranks)
+
+
+def initial_ranks(matrix, initial=None):
+    """
+    Returns the starting rank vector for `matrix`: uniform, or taken
+    from the dict `initial` with missing pages at 1 / N and
+    normalized to sum to 1.
+    """
+    n = len(matrix.pages)
+    if initial is None:
+        return np.full(n, 1 / n)
+    ranks = np.fromiter(
+        (initial.get(page, 1 / n) for page in matrix.pages),
+        dtype=np.float64, count=n
+    )
+    return ranks / ranks.sum()
+
+
+def sample_pagerank(corpus, damping_factor, n, seed=None, surfers=1024,
+                    matrix=None, workers=None):
+    """
+    Return PageRank values for each page by sampling about `n` pages
+    with many random surfers walking at once.
+
+    If `workers` is given, the samples are split evenly across that
+    many processes, each running its own surfers with an independent
+    seed derived from `seed` over a shared-memory copy of the links,
+    and their visit counts are added up.
+
+    Returns a dictionary like pagerank.sample_pagerank. See
+    sample_pagerank_intervals for the meaning of the other arguments.
+    """
+    if workers is None:
+        ranks, _ = sample_pagerank_intervals(
+            corpus, damping_factor, n, seed=seed, surfers=surfers,
+            matrix=matrix
+        )
+        return ranks
+
+    if matrix is None:
+        matrix = LinkMatrix.from_corpus(corpus)
+    indptr, indices = matrix.outbound
+    arrays = {
+        "indptr": indptr, "indices": indices, "degree": matrix.out_degree
+    }
+    blocks = {}
+    try:
+        for name, values in arrays.items():
+            block = shared_memory.SharedMemory(
+                create=True, size=max(values.nbytes, 1)
+            )
+            blocks[name] = block
+            np.ndarray(values.shape, values.dtype, block.buf)[:] = values
+        layout = {
+            name: (blocks[name].name, values.shape, values.dtype.str)
+            for name, values in arrays.items()
+        }
+
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        shares = [n // workers + (i < n % workers) for i in range(workers)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=attach_links, initargs=(layout,)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    sample_shared, damping_factor, share,
+                    max(1, surfers // workers), child
+                )
+                for share, child in zip(shares, seeds)
+                if share
+            ]
+            counts = sum(future.result() for future in futures)
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+    return matrix.to_dict(counts / counts.sum())
+
+
+def sample_pagerank_intervals(corpus, damping_factor, n, seed=None,
+                              surfers=1024, matrix=None, batches=30,
+                              z=1.96, burn_in=None, stats=None):
+    """
+    Estimate PageRank by simulating `surfers` independent random
+    surfers in lockstep with NumPy, each starting on a random page,
+    for a total of `n` samples rounded up to a whole number of steps.
+
+    Every surfer first takes `burn_in` uncounted steps, by default
+    enough for the influence of its starting page to fall below 1e-4,
+    since with many short walks that start would otherwise bias the
+    estimate. Surfers are capped so each counts at least as many
+    steps as it burns.
+
+    On each step, every surfer follows a random link from its page
+    with probability `damping_factor`, and otherwise (or if its page
+    has no links) jumps to a page chosen uniformly at random. Links
+    are looked up in the CSR outbound arrays, so no per-page
+    distribution is ever built.
+
+    Returns (ranks, intervals): dictionaries keyed by page name of
+    the estimated PageRank, and of a (low, high) confidence interval
+    for it. Intervals come from the spread between `batches` groups
+    of surfers, which are independent, at `z` standard errors (1.96
+    for 95%; with fewer batches, use the Student t value for
+    `batches` - 1 degrees of freedom instead). `seed` makes the
+    result reproducible. If `stats` is a dict, it is filled with the
+    (batches, pages) array of visit frequencies of each batch.
+    """
+    if matrix is None:
+        matrix = LinkMatrix.from_corpus(corpus)
+    rng = np.random.default_rng(seed)
+    pages = len(matrix.pages)
+    if burn_in is None:
+        burn_in = default_burn_in(damping_factor)
+    surfers = max(min(surfers, n // max(burn_in, 1)), batches)
+    steps = -(-n // surfers)
+    indptr, indices = matrix.outbound
+    counts = surf(
+        indptr, indices, matrix.out_degree, damping_factor,
+        surfers, steps, burn_in, batches, rng
+    )
+
+    per_batch = counts.reshape(batches, pages)
+    samples = np.bincount(
+        np.arange(surfers) % batches, minlength=batches
+    ) * steps
+    frequencies = per_batch / samples[:, None]
+    ranks = per_batch.sum(axis=0) / (surfers * steps)
+    error = z * frequencies.std(axis=0, ddof=1) / np.sqrt(batches)
+    if stats is not None:
+        stats["frequencies"] = frequencies
+    low = np.clip(ranks - error, 0, 1)
+    high = np.clip(ranks + error, 0, 1)
+
+    intervals = dict(zip(matrix.pages, zip(low.tolist(), high.tolist())))
+    return matrix.to_dict(ranks), intervals
+
+
+def default_burn_in(damping_factor):
+    """
+    Returns the number of steps after which a surfer's starting page
+    has less than 1e-4 influence on where it is.
+    """
+    if not 0 < damping_factor < 1:
+        return 0
+    return math.ceil(math.log(1e-4) / math.log(damping_factor))
+
+
+def surf(indptr, indices, degree, damping_factor, surfers, steps, burn_in,
+         batches, rng):
+    """
+    Walks `surfers` random surfers over the outbound CSR links for
+    `burn_in` uncounted steps and then `steps` counted ones.
+
+    Returns the visit counts of each page per batch as one flat array,
+    with the count of page `p` in batch `b` at `b * pages + p`.
+    """
+    pages = len(degree)
+
+    def walk(position):
+        jump = (rng.random(surfers) >= damping_factor) | (degree[position] == 0)
+        follow = ~jump
+        choice = rng.random(follow.sum()) * degree[position[follow]]
+        position[follow] = indices[
+            indptr[position[follow]] + choice.astype(np.int64)
+        ]
+        position[jump] = rng.integers(pages, size=jump.sum())
+        return position
+
+    # Surfer s belongs to batch s % batches; visits are counted per
+    # batch by offsetting page numbers by batch * pages
+    offsets = (np.arange(surfers) % batches) * pages
+    counts = np.zeros(batches * pages, dtype=np.int64)
+    chunk = max(1, 2 ** 20 // surfers)
+    visited = np.empty((chunk, surfers), dtype=np.int64)
+
+    position = rng.integers(pages, size=surfers)
+    filled = 0
+    for step in range(-burn_in, steps):
+        if step < 0:
+            position = walk(position)
+            continue
+        visited[filled] = position + offsets
+        filled += 1
+        if filled == chunk or step == steps - 1:
+            counts += np.bincount(
+                visited[:filled].ravel(), minlength=batches * pages
+            )
+            filled = 0
+        if step < steps - 1:
+            position = walk(position)
+    return counts
+
+
+# Link arrays attached from shared memory in each sampling worker
+shared_links = {}
+
+
+def attach_links(layout):
+    """
+    Pool initializer mapping the shared-memory link arrays described
+    by `layout` into `shared_links`.
+    """
+    for name, (block_name, shape, dtype) in layout.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        shared_links[name] = (block, np.ndarray(shape, dtype, block.buf))
+
+
+def sample_shared(damping_factor, n, surfers, seed):
+    """
+    Returns the visit counts of each page for about `n` samples taken
+    by `surfers` surfers over the shared links, seeded with `seed`.
+    """
+    indptr = shared_links["indptr"][1]
+    indices = shared_links["indices"][1]
+    degree = shared_links["degree"][1]
+    burn_in = default_burn_in(damping_factor)
+    surfers = max(min(surfers, n // max(burn_in, 1)), 1)
+    steps = -(-n // surfers)
+    return surf(
+        indptr, indices, degree, damping_factor, surfers, steps, burn_in, 1,
+        np.random.default_rng(seed)
+    )